@@ -1,46 +1,337 @@
+import os
 import re
 import json
+import codecs
+import time
+import argparse
+import tracemalloc
+from json.encoder import encode_basestring_ascii
 
-def set_to_json(input_file, output_file):
-    def add_to_dict(d, path, value):
+# A token is either a double-quoted string (descriptions etc.) or a bare word
+TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+def tokenize(text):
+    return [bare if bare else quoted for quoted, bare in TOKEN_RE.findall(text)]
+
+# Normalize a node to the list of names it holds. A leaf is stored as a string,
+# a repeated leaf as a list and a leaf that gained children as a dict.
+def leaf_values(node):
+    if node is None:
+        return []
+    if isinstance(node, dict):
+        return list(node)
+    if isinstance(node, list):
+        return node
+    return [node]
+
+# Walk keys down the tree, treating leaves as branches with empty children
+def branch(node, *keys):
+    for key in keys:
+        if not isinstance(node, dict):
+            return {}
+        node = node.get(key)
+        if node is None:
+            return {}
+        if not isinstance(node, dict):
+            node = {value: {} for value in leaf_values(node)}
+    return node
+
+# Yield the token path of every statement in the tree, i.e. the inverse of
+# apply_line for "set" lines
+def iter_statements(node, path=()):
+    if isinstance(node, dict):
+        if not node and path:
+            yield path
+        for key, child in node.items():
+            yield from iter_statements(child, path + (key,))
+    else:
+        for value in leaf_values(node):
+            yield path + (value,)
+
+# Render a token path as configuration text, quoting tokens that need it
+def format_statement(tokens):
+    return " ".join(f'"{token}"' if not token or any(c.isspace() for c in token) else token for token in tokens)
+
+def load_json_config(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def add_to_dict(d, path):
+    for key in path:
+        node = d.get(key)
+        if node is None:
+            node = d[key] = {}
+        elif not isinstance(node, dict):
+            # A leaf that gains children keeps its old values as empty branches
+            node = d[key] = {v: {} for v in leaf_values(node)}
+        d = node
+    return d
+
+def set_leaf(d, path, value):
+    d = add_to_dict(d, path[:-1])
+    key = path[-1]
+    node = d.get(key)
+    if node is None:
+        d[key] = value
+    elif isinstance(node, dict):
+        node.setdefault(value, {})
+    elif isinstance(node, list):
+        if value not in node:
+            node.append(value)
+    elif node != value:
+        # Repeated leaves (source-address A, source-address B) become a list
+        d[key] = [node, value]
+
+def remove_from_dict(d, path):
+    for i, key in enumerate(path[:-1]):
+        node = d.get(key)
+        if node is None:
+            return
+        if not isinstance(node, dict):
+            # "delete ... source-address A" drops one value of a leaf
+            if i == len(path) - 2:
+                values = [v for v in leaf_values(node) if v != path[-1]]
+                if not values:
+                    del d[key]
+                else:
+                    d[key] = values[0] if len(values) == 1 else values
+            return
+        d = node
+    d.pop(path[-1], None)
+
+# Split a line into its verb and tokens; lines other than set/delete give (None, [])
+def parse_line(line):
+    line = line.strip()
+    if line.startswith("set "):
+        return "set", tokenize(line[4:])
+    if line.startswith("delete "):
+        return "delete", tokenize(line[7:])
+    return None, []
+
+def apply_statement(config, verb, path):
+    if verb == "set":
         if len(path) == 1:
-            d[path[0]] = value
-        else:
-            key = path[0]
-            if key not in d:
-                d[key] = {}
-            add_to_dict(d[key], path[1:], value)
+            config.setdefault(path[0], {})
+        elif path:
+            set_leaf(config, path[:-1], path[-1])
+    elif verb == "delete" and path:
+        remove_from_dict(config, path)
+
+def apply_line(config, line):
+    apply_statement(config, *parse_line(line))
+
+# Only called with a schema, so srx_schema (which imports this module) is
+# imported on first use rather than at load time
+def validate_line(schema, invalid, number, line, path):
+    from srx_schema import validate_statement
+    position = validate_statement(schema, path)
+    if position is not None:
+        invalid.append({"line": number, "text": line.strip(), "position": position, "token": path[position]})
+
+# Keys whose children are evaluated in configuration order by Junos (policies
+# within a zone pair, NAT rules within a rule-set, filter terms, ...) and so
+# keep their input order in canonical output
+ORDERED_KEYS = frozenset({"policy", "rule", "term", "name-server"})
+
+# Yield the JSON text of a tree in the same layout as json.dump(indent=4).
+# In canonical mode keys and leaf lists are sorted as they are written, except
+# below ORDERED_KEYS, so configs that differ only in statement order give the
+# same bytes.
+def iter_json(node, canonical=False, ordered=False, indent="\n"):
+    inner = indent + "    "
+    if isinstance(node, dict):
+        if not node:
+            yield "{}"
+            return
+        separator = "{"
+        for key, child in (sorted(node.items()) if canonical and not ordered else node.items()):
+            yield f"{separator}{inner}{encode_basestring_ascii(key)}: "
+            yield from iter_json(child, canonical, key in ORDERED_KEYS, inner)
+            separator = ","
+        yield indent + "}"
+    elif isinstance(node, list):
+        if not node:
+            yield "[]"
+            return
+        values = sorted(node) if canonical and not ordered else node
+        yield "[" + inner + ("," + inner).join(map(encode_basestring_ascii, values)) + indent + "]"
+    else:
+        yield encode_basestring_ascii(node)
 
+def write_json(config, outfile, canonical=False):
+    if canonical:
+        outfile.writelines(iter_json(config, canonical=True))
+    else:
+        json.dump(config, outfile, indent=4)
+
+# Yield (line number, verb, tokens) for every set/delete line of an iterable
+# of lines, e.g. an open file, a list or the output of an SSH session
+def iter_events(lines, schema=None, invalid=None):
+    if invalid is None:
+        invalid = []
+    for number, line in enumerate(lines, 1):
+        verb, path = parse_line(line)
+        if verb:
+            if schema is not None:
+                validate_line(schema, invalid, number, line, path)
+            yield number, verb, path
+
+# Build the tree from an iterable of lines without going through a file. With
+# a schema, lines that do not fit it are appended to invalid.
+def parse_lines(lines, schema=None, invalid=None):
     config = {}
-    current_path = []
+    if invalid is None:
+        invalid = []
+    for number, line in enumerate(lines, 1):
+        verb, path = parse_line(line)
+        if schema is not None and verb:
+            validate_line(schema, invalid, number, line, path)
+        apply_statement(config, verb, path)
+    return config
+
+# Incremental builder for sources that deliver arbitrary chunks of text or
+# bytes (sockets, queues). Partial lines are held until their newline arrives.
+class ConfigBuilder:
+    def __init__(self, schema=None, encoding='utf-8'):
+        self.config = {}
+        self.invalid = []
+        self.schema = schema
+        self.lines = 0
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def add_line(self, line):
+        self.lines += 1
+        verb, path = parse_line(line)
+        if self.schema is not None and verb:
+            validate_line(self.schema, self.invalid, self.lines, line, path)
+        apply_statement(self.config, verb, path)
 
+    def feed(self, data):
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        lines = (self._pending + data).split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self.add_line(line)
+
+    # Flush a trailing line without a newline and return the tree
+    def finish(self):
+        tail = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        if tail.strip():
+            self.add_line(tail)
+        return self.config
+
+# With a compiled schema (see srx_schema.py) every statement is checked while
+# it is tokenized; the lines that do not fit it are returned, not rejected.
+# Passing a stats dict runs the instrumented conversion below instead.
+def set_to_json(input_file, output_file, schema=None, stats=None, canonical=False):
+    if stats is not None:
+        return profiled_set_to_json(input_file, output_file, schema, stats, canonical)
+
+    invalid = []
     with open(input_file, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith("set "):
-                set_match = re.match(r'set (.+)', line)
-                if set_match:
-                    path = set_match.group(1).split()
-                    current_path = path
-                else:
-                    add_to_dict(config, current_path, line)
-            elif line.startswith("delete "):
-                delete_match = re.match(r'delete (.+)', line)
-                if delete_match:
-                    path = delete_match.group(1).split()
-                    if path:
-                        key = path[-1]
-                        if key in config:
-                            del config[path[0]]
-            else:
-                current_path = []
+        config = parse_lines(file, schema, invalid)
 
     # Write the JSON to the output file
     with open(output_file, 'w') as outfile:
-        json.dump(config, outfile, indent=4)
+        write_json(config, outfile, canonical)
 
-if __name__ == '__main__':
-    input_file = 'input.set'  # Replace with the path to your input set file
-    output_file = 'output.json'  # Replace with the desired output JSON file
+    return invalid
+
+# Same conversion, run one stage at a time so each stage can be timed on its
+# own: read, tokenize (with validation), build and write. Wall and CPU time,
+# line counts by verb and the deepest path are stored in stats. Holding every
+# parsed line between stages costs memory, so this path is only taken when
+# asked for. The stages always run with tracemalloc off, since tracing slows
+# every allocation several times over. With stats["trace_memory"] set, the
+# plain streaming conversion is run a second time under tracemalloc (output
+# discarded) and its peak is stored as "streaming_peak_bytes"; that is the
+# peak of a normal set_to_json call, not of the staged run.
+def profiled_set_to_json(input_file, output_file, schema, stats, canonical=False):
+    stages = stats["stages"] = {}
+    clock = [time.perf_counter(), time.process_time()]
+
+    def finish(stage):
+        wall, cpu = time.perf_counter(), time.process_time()
+        stages[stage] = {"wall_seconds": wall - clock[0], "cpu_seconds": cpu - clock[1]}
+        clock[:] = wall, cpu
+
+    with open(input_file, 'r') as file:
+        lines = file.readlines()
+    finish("read")
+
+    invalid = []
+    statements = []
+    verbs = {"set": 0, "delete": 0, "other": 0}
+    for number, line in enumerate(lines, 1):
+        verb, path = parse_line(line)
+        verbs[verb or "other"] += 1
+        if schema is not None and verb:
+            validate_line(schema, invalid, number, line, path)
+        statements.append((verb, path))
+    finish("tokenize")
 
-    set_to_json(input_file, output_file)
+    config = {}
+    deepest = []
+    for verb, path in statements:
+        if len(path) > len(deepest):
+            deepest = path
+        apply_statement(config, verb, path)
+    finish("build")
+
+    with open(output_file, 'w') as outfile:
+        write_json(config, outfile, canonical)
+    finish("write")
+
+    stats["lines"] = len(lines)
+    stats["verbs"] = verbs
+    stats["invalid_lines"] = len(invalid)
+    stats["max_depth"] = len(deepest)
+    stats["deepest_path"] = format_statement(deepest)
+    stats["wall_seconds"] = sum(stage["wall_seconds"] for stage in stages.values())
+    stats["cpu_seconds"] = sum(stage["cpu_seconds"] for stage in stages.values())
+    if stats.get("trace_memory") and not tracemalloc.is_tracing():
+        stats["streaming_peak_bytes"] = streaming_peak_bytes(input_file, schema, canonical)
+    return invalid
+
+# Peak traced memory of the plain conversion, with the JSON written nowhere
+def streaming_peak_bytes(input_file, schema=None, canonical=False):
+    tracemalloc.start()
+    try:
+        with open(input_file, 'r') as file:
+            config = parse_lines(file, schema)
+        with open(os.devnull, 'w') as outfile:
+            write_json(config, outfile, canonical)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert an SRX set configuration to JSON')
+    parser.add_argument('input_file', nargs='?', default='input.set', help='SRX set file')
+    parser.add_argument('output_file', nargs='?', default='output.json', help='Path to write the converted JSON to')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help='Record per-stage timings and print them, or write them to FILE as JSON')
+    parser.add_argument('--canonical', action='store_true', help='Sort keys except where Junos evaluates in order')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='With --profile, also measure the peak memory of a separate streaming conversion')
+    args = parser.parse_args()
+
+    stats = {"trace_memory": args.trace_memory} if args.profile else None
+    try:
+        set_to_json(args.input_file, args.output_file, stats=stats, canonical=args.canonical)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+
+    if stats is not None:
+        if args.profile == '-':
+            print(json.dumps(stats, indent=4))
+        else:
+            with open(args.profile, 'w') as f:
+                json.dump(stats, f, indent=4)
+
+if __name__ == '__main__':
+    main()
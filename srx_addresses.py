@@ -0,0 +1,223 @@
+import json
+import argparse
+import ipaddress
+from bisect import bisect_right
+
+from juniper_srx_set_to_json import branch, leaf_values, load_json_config
+
+# IPv4 lives in the IPv4-mapped IPv6 block so both families share one integer space
+V4_BASE = 0xffff00000000
+MAX_ADDRESS = (1 << 128) - 1
+
+PREDEFINED_ADDRESSES = {
+    "any": [(0, MAX_ADDRESS)],
+    "any-ipv4": [(V4_BASE, V4_BASE + 0xffffffff)],
+    "any-ipv6": [(0, V4_BASE - 1), (V4_BASE + 0x100000000, MAX_ADDRESS)],
+}
+
+def ip_to_int(text):
+    ip = ipaddress.ip_address(text)
+    return V4_BASE + int(ip) if ip.version == 4 else int(ip)
+
+def prefix_to_interval(text):
+    network = ipaddress.ip_network(text, strict=False)
+    base = V4_BASE if network.version == 4 else 0
+    return (base + int(network.network_address), base + int(network.broadcast_address))
+
+def int_to_ip(value):
+    if V4_BASE <= value <= V4_BASE + 0xffffffff:
+        return str(ipaddress.IPv4Address(value - V4_BASE))
+    return str(ipaddress.IPv6Address(value))
+
+# Sort intervals and merge the ones that overlap or touch
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+# The addresses outside merged intervals
+def complement_intervals(intervals):
+    complement = []
+    start = 0
+    for low, high in intervals:
+        if low > start:
+            complement.append((start, low - 1))
+        start = high + 1
+    if start <= MAX_ADDRESS:
+        complement.append((start, MAX_ADDRESS))
+    return complement
+
+# Intervals for one "address" entry, or None when it cannot be expressed as IPs
+# (dns-name, wildcard-address)
+def address_entry_intervals(node):
+    if isinstance(node, dict) and "range-address" in node:
+        low = next(iter(branch(node, "range-address")))
+        high = next(iter(leaf_values(branch(node, "range-address", low).get("to"))), low)
+        return [(ip_to_int(low), ip_to_int(high))]
+    for value in leaf_values(node):
+        try:
+            return [prefix_to_interval(value)]
+        except ValueError:
+            continue
+    return None
+
+# Collect address entries and address-sets of every book, keyed by (book, name).
+# Zone address-books are stored under the zone name and attached to that zone.
+def load_address_books(config):
+    books = list(branch(config, "security", "address-book").items())
+    zone_books = {}
+
+    for book, node in books:
+        for zone in branch(node, "attach", "zone"):
+            zone_books.setdefault(zone, []).append(book)
+
+    zones = branch(config, "security", "zones", "security-zone")
+    for zone in zones:
+        if "address-book" in branch(zones, zone):
+            books.append((zone, branch(zones, zone, "address-book")))
+            zone_books.setdefault(zone, []).append(zone)
+
+    addresses = {}
+    address_sets = {}
+    for book, node in books:
+        for name, entry in branch(node, "address").items():
+            try:
+                addresses[(book, name)] = address_entry_intervals(entry)
+            except ValueError:
+                addresses[(book, name)] = None
+        for name in branch(node, "address-set"):
+            members = branch(node, "address-set", name)
+            address_sets[(book, name)] = (
+                [("address", member) for member in leaf_values(members.get("address"))] +
+                [("address-set", member) for member in leaf_values(members.get("address-set"))]
+            )
+
+    return addresses, address_sets, zone_books
+
+# Flatten every address-set once. Each set is resolved a single time and
+# reused by every set that nests it; cycles are reported and broken.
+def flatten_address_sets(addresses, address_sets):
+    resolved = {key: merge_intervals(intervals or []) for key, intervals in addresses.items()}
+    unresolved = {key for key, intervals in addresses.items() if intervals is None}
+    visiting = set()
+
+    def member_key(book, kind, member):
+        for scope in (book, "global"):
+            key = (scope, member)
+            if key in (address_sets if kind == "address-set" else addresses):
+                return key
+        return None
+
+    def resolve_set(key):
+        if key in resolved:
+            return resolved[key]
+        if key in visiting:
+            print(f"Warning: address-set cycle through '{key[1]}' in address-book '{key[0]}'")
+            return []
+        visiting.add(key)
+        intervals = []
+        for kind, member in address_sets[key]:
+            if member in PREDEFINED_ADDRESSES:
+                intervals.extend(PREDEFINED_ADDRESSES[member])
+                continue
+            target = member_key(key[0], kind, member)
+            if target is None:
+                unresolved.add((key[0], member))
+            elif kind == "address-set":
+                intervals.extend(resolve_set(target))
+            else:
+                intervals.extend(resolved[target])
+        visiting.discard(key)
+        resolved[key] = merge_intervals(intervals)
+        return resolved[key]
+
+    for key in address_sets:
+        resolve_set(key)
+
+    return resolved, unresolved
+
+# Resolve a name as seen from a zone: attached books first, then the global book
+def resolve_address_name(resolver, zone, name):
+    if name in PREDEFINED_ADDRESSES:
+        return PREDEFINED_ADDRESSES[name]
+    resolved = resolver["resolved"]
+    for book in resolver["zone_books"].get(zone, []) + ["global"]:
+        if (book, name) in resolved:
+            return resolved[(book, name)]
+    return []
+
+# Stabbing index: sorted segment starts plus the objects covering each segment,
+# so "which objects contain this IP" is one bisect
+def build_interval_index(resolved):
+    opening = {}
+    closing = {}
+    for key, intervals in resolved.items():
+        for start, end in intervals:
+            opening.setdefault(start, []).append(key)
+            closing.setdefault(end + 1, []).append(key)
+
+    starts = []
+    owners = []
+    active = set()
+    for point in sorted(set(opening) | set(closing)):
+        active.difference_update(closing.get(point, ()))
+        active.update(opening.get(point, ()))
+        starts.append(point)
+        owners.append(tuple(sorted(active)))
+
+    return starts, owners
+
+def objects_containing(index, ip):
+    starts, owners = index
+    position = bisect_right(starts, ip_to_int(ip) if isinstance(ip, str) else ip) - 1
+    return owners[position] if position >= 0 else ()
+
+def build_address_resolver(config):
+    addresses, address_sets, zone_books = load_address_books(config)
+    resolved, unresolved = flatten_address_sets(addresses, address_sets)
+    return {
+        "resolved": resolved,
+        "unresolved": unresolved,
+        "zone_books": zone_books,
+        "index": build_interval_index(resolved),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve SRX address-book objects of a converted config into IP intervals')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('--ip', action='append', default=[], help='Report the objects containing this IP (repeatable)')
+    parser.add_argument('--output-file', type=str, help='Write every resolved object as address ranges to this file')
+    args = parser.parse_args()
+
+    try:
+        resolver = build_address_resolver(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    for ip in args.ip:
+        names = [f"{book}/{name}" for book, name in objects_containing(resolver["index"], ip)]
+        print(f"{ip}: {', '.join(names) if names else '-'}")
+
+    if args.output_file:
+        output = {
+            f"{book}/{name}": [f"{int_to_ip(start)}-{int_to_ip(end)}" for start, end in intervals]
+            for (book, name), intervals in resolver["resolved"].items()
+        }
+        with open(args.output_file, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Successfully resolved {len(output)} address objects to {args.output_file}")
+
+    for book, name in sorted(resolver["unresolved"]):
+        print(f"Warning: could not resolve '{name}' in address-book '{book}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import json
+import argparse
+import ipaddress
+
+import numpy as np
+
+from juniper_srx_set_to_json import load_json_config, format_statement
+from srx_addresses import load_address_books, V4_BASE
+from srx_unused import object_statement
+
+# Offsetting every set's IPv4 intervals by set_index << GROUP_SHIFT keeps the
+# sets apart in one sorted int64 array; the gap is wider than IPv4 itself, so
+# merging never bridges two sets
+GROUP_SHIFT = 33
+
+# Highest power of two not above n, for positive int64 arrays
+def floor_power_of_two(n):
+    n = n.copy()
+    for shift in (1, 2, 4, 8, 16, 32):
+        n |= n >> shift
+    return (n + 1) >> 1
+
+# Merge the intervals of every group and split the result into the fewest
+# CIDR blocks. groups, starts and ends are parallel int64 arrays of IPv4
+# offsets; returns (groups, network, prefix length) arrays.
+def aggregate_ipv4(groups, starts, ends):
+    if not len(starts):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    offset = groups << GROUP_SHIFT
+    order = np.lexsort((starts, groups))
+    starts = starts[order] + offset[order]
+    ends = ends[order] + offset[order]
+    running_end = np.maximum.accumulate(ends)
+    # A new merged interval starts wherever the start is past everything so far
+    new = np.ones(len(starts), dtype=bool)
+    new[1:] = starts[1:] > running_end[:-1] + 1
+    first = np.flatnonzero(new)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    starts = starts[first]
+    ends = running_end[last]
+
+    # Peel the largest aligned block off the front of every interval at once;
+    # an interval needs at most 64 rounds
+    blocks = []
+    while len(starts):
+        size = floor_power_of_two(ends - starts + 1)
+        aligned = starts & -starts
+        size = np.where((aligned > 0) & (aligned < size), aligned, size)
+        blocks.append((starts, size))
+        starts = starts + size
+        remaining = starts <= ends
+        starts, ends = starts[remaining], ends[remaining]
+
+    starts = np.concatenate([b[0] for b in blocks])
+    sizes = np.concatenate([b[1] for b in blocks])
+    groups = starts >> GROUP_SHIFT
+    networks = starts & ((1 << GROUP_SHIFT) - 1)
+    lengths = 32 - np.log2(sizes).astype(np.int64)
+    order = np.lexsort((networks, groups))
+    return groups[order], networks[order], lengths[order]
+
+# Compute the CIDR cover of the address members of every address-set. Nested
+# address-set members and entries without IPs (dns-name, wildcard) are kept
+# as they are. Returns {(book, set): (replaced members, [networks])} for the
+# sets whose cover is smaller than their current members.
+def aggregate_address_sets(config):
+    addresses, address_sets, _ = load_address_books(config)
+    keys = list(address_sets)
+    members = {key: [] for key in keys}
+    v4 = ([], [], [])
+    v6 = {}
+    for index, key in enumerate(keys):
+        book, _ = key
+        for kind, member in address_sets[key]:
+            if kind != "address":
+                continue
+            intervals = addresses.get((book, member)) or addresses.get(("global", member))
+            if not intervals:
+                continue
+            members[key].append(member)
+            start, end = intervals[0]
+            if V4_BASE <= start and end <= V4_BASE + 0xffffffff:
+                v4[0].append(index)
+                v4[1].append(start - V4_BASE)
+                v4[2].append(end - V4_BASE)
+            else:
+                v6.setdefault(index, []).append((start, end))
+
+    networks = {index: [] for index in range(len(keys))}
+    groups, starts, lengths = aggregate_ipv4(*(np.array(column, dtype=np.int64) for column in v4))
+    for group, start, length in zip(groups.tolist(), starts.tolist(), lengths.tolist()):
+        networks[group].append(ipaddress.IPv4Network((start, length)))
+    # IPv6 members are rare enough for the ipaddress module
+    for index, intervals in v6.items():
+        networks[index].extend(ipaddress.collapse_addresses(
+            network for start, end in intervals
+            for network in ipaddress.summarize_address_range(ipaddress.IPv6Address(start), ipaddress.IPv6Address(end))
+        ))
+
+    return {
+        keys[index]: (members[keys[index]], cover)
+        for index, cover in networks.items() if len(cover) < len(members[keys[index]])
+    }
+
+# set/delete commands that add an entry per new network (reusing an entry of
+# the same book with exactly that prefix) and swap the set members over
+def aggregation_commands(config, aggregated):
+    addresses, _, _ = load_address_books(config)
+    by_interval = {}
+    for (book, name), intervals in addresses.items():
+        if intervals:
+            by_interval.setdefault((book, intervals[0]), name)
+
+    commands = []
+    created = set()
+    for (book, set_name), (replaced, cover) in aggregated.items():
+        set_prefix = object_statement(config, ("address-set", book, set_name))
+        names = []
+        for network in cover:
+            base = V4_BASE if network.version == 4 else 0
+            interval = (base + int(network.network_address), base + int(network.broadcast_address))
+            name = by_interval.get((book, interval))
+            if name is None:
+                name = f"net-{network}"
+                if (book, name) not in created:
+                    created.add((book, name))
+                    address = object_statement(config, ("address", book, name))
+                    commands.append(f"set {format_statement(address + (str(network),))}")
+            names.append(name)
+        for name in names:
+            commands.append(f"set {format_statement(set_prefix + ('address', name))}")
+        for name in replaced:
+            if name not in names:
+                commands.append(f"delete {format_statement(set_prefix + ('address', name))}")
+    return commands
+
+def main():
+    parser = argparse.ArgumentParser(description='Collapse SRX address-set members into minimal CIDR blocks')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', help='Write the set/delete commands to this file instead of printing')
+    args = parser.parse_args()
+
+    try:
+        config = load_json_config(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    aggregated = aggregate_address_sets(config)
+    commands = aggregation_commands(config, aggregated)
+    if args.output_file:
+        with open(args.output_file, 'w') as f:
+            f.writelines(command + "\n" for command in commands)
+        for (book, name), (replaced, cover) in aggregated.items():
+            print(f"{book}/{name}: {len(replaced)} members -> {len(cover)} networks")
+        print(f"Wrote {len(commands)} commands for {len(aggregated)} address-sets to {args.output_file}")
+    else:
+        for command in commands:
+            print(command)
+
+if __name__ == "__main__":
+    main()
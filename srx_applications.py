@@ -0,0 +1,335 @@
+import json
+import argparse
+
+from juniper_srx_set_to_json import branch, leaf_values, load_json_config
+from srx_addresses import merge_intervals
+
+# A service point is protocol << 16 | port, so an application is a list of
+# integer intervals in one dimension. Protocols without ports span 0-65535.
+MAX_SERVICE = (256 << 16) - 1
+ANY_SERVICE = [(0, MAX_SERVICE)]
+
+PROTOCOL_NUMBERS = {
+    "icmp": 1, "igmp": 2, "tcp": 6, "udp": 17, "gre": 47, "esp": 50, "ah": 51,
+    "icmp6": 58, "ospf": 89, "pim": 103, "vrrp": 112, "sctp": 132,
+}
+
+PORT_NAMES = {
+    "ftp": 21, "ssh": 22, "telnet": 23, "smtp": 25, "domain": 53, "dns": 53,
+    "tftp": 69, "http": 80, "pop3": 110, "sunrpc": 111, "ntp": 123, "netbios-ssn": 139,
+    "imap": 143, "snmp": 161, "snmptrap": 162, "bgp": 179, "ldap": 389, "https": 443,
+    "microsoft-ds": 445, "syslog": 514, "ldaps": 636, "ms-sql-s": 1433, "radius": 1812,
+    "mysql": 3306, "rdp": 3389,
+}
+
+# Predefined junos-* applications (groups junos-defaults) as "protocol/ports"
+# terms separated by spaces. ICMP types and RPC program numbers are not
+# modelled, so those entries cover their whole protocol or port. Compiled to
+# intervals the first time a junos-* name is looked up.
+JUNOS_DEFAULT_APPLICATIONS = {
+    "junos-aol": "tcp/5190-5193",
+    "junos-bgp": "tcp/179",
+    "junos-biff": "udp/512",
+    "junos-bootpc": "udp/68",
+    "junos-bootps": "udp/67",
+    "junos-chargen": "udp/19",
+    "junos-cvspserver": "tcp/2401",
+    "junos-dhcp-client": "udp/68",
+    "junos-dhcp-relay": "udp/67",
+    "junos-dhcp-server": "udp/67",
+    "junos-discard": "udp/9",
+    "junos-dns-tcp": "tcp/53",
+    "junos-dns-udp": "udp/53",
+    "junos-echo": "udp/7",
+    "junos-finger": "tcp/79",
+    "junos-ftp": "tcp/21",
+    "junos-ftp-data": "tcp/20",
+    "junos-gnutella": "udp/6346-6347",
+    "junos-gopher": "tcp/70",
+    "junos-gprs-gtp-c": "udp/2123 tcp/2123",
+    "junos-gprs-gtp-u": "udp/2152 tcp/2152",
+    "junos-gprs-gtp-v0": "udp/3386 tcp/3386",
+    "junos-gprs-sctp": "sctp",
+    "junos-gre": "gre",
+    "junos-gtp": "udp/2123 udp/2152",
+    "junos-h323": "tcp/1720 udp/1719",
+    "junos-http": "tcp/80",
+    "junos-http-ext": "tcp/7001",
+    "junos-https": "tcp/443",
+    "junos-icmp-all": "icmp",
+    "junos-icmp-ping": "icmp",
+    "junos-icmp6-all": "icmp6",
+    "junos-icmp6-dst-unreach-addr": "icmp6",
+    "junos-icmp6-dst-unreach-admin": "icmp6",
+    "junos-icmp6-dst-unreach-beyond": "icmp6",
+    "junos-icmp6-dst-unreach-port": "icmp6",
+    "junos-icmp6-dst-unreach-route": "icmp6",
+    "junos-icmp6-echo-reply": "icmp6",
+    "junos-icmp6-echo-request": "icmp6",
+    "junos-icmp6-packet-too-big": "icmp6",
+    "junos-icmp6-param-prob-header": "icmp6",
+    "junos-icmp6-param-prob-nexthdr": "icmp6",
+    "junos-icmp6-param-prob-option": "icmp6",
+    "junos-icmp6-time-exceed-reassembly": "icmp6",
+    "junos-icmp6-time-exceed-transit": "icmp6",
+    "junos-ident": "tcp/113",
+    "junos-ike": "udp/500",
+    "junos-ike-nat": "udp/4500",
+    "junos-imap": "tcp/143",
+    "junos-imaps": "tcp/993",
+    "junos-internet-locator-service": "tcp/389",
+    "junos-irc": "tcp/6660-6669",
+    "junos-l2tp": "udp/1701",
+    "junos-ldap": "tcp/389",
+    "junos-ldp-tcp": "tcp/646",
+    "junos-ldp-udp": "udp/646",
+    "junos-lpr": "tcp/515",
+    "junos-mail": "tcp/25",
+    "junos-mgcp": "udp/2427 udp/2727",
+    "junos-mgcp-ca": "udp/2727",
+    "junos-mgcp-ua": "udp/2427",
+    "junos-ms-rpc-epm": "tcp/135",
+    "junos-ms-rpc-tcp": "tcp/135",
+    "junos-ms-rpc-udp": "udp/135",
+    "junos-ms-sql": "tcp/1433",
+    "junos-msn": "tcp/1863",
+    "junos-mysql": "tcp/3306",
+    "junos-nbds": "udp/138",
+    "junos-nbname": "udp/137",
+    "junos-netbios-session": "tcp/139",
+    "junos-nfs": "udp/2049",
+    "junos-nfsd-tcp": "tcp/2049",
+    "junos-nfsd-udp": "udp/2049",
+    "junos-nntp": "tcp/119",
+    "junos-ns-global": "tcp/15397",
+    "junos-ns-global-pro": "tcp/15397",
+    "junos-nsm": "udp/69",
+    "junos-ntalk": "udp/518",
+    "junos-ntp": "udp/123",
+    "junos-ospf": "ospf",
+    "junos-pc-anywhere": "udp/5632",
+    "junos-ping": "icmp",
+    "junos-pingv6": "icmp6",
+    "junos-pop3": "tcp/110",
+    "junos-pptp": "tcp/1723",
+    "junos-printer": "tcp/515",
+    "junos-r2cp": "udp/28672",
+    "junos-radacct": "udp/1813",
+    "junos-radius": "udp/1812",
+    "junos-rdp": "tcp/3389",
+    "junos-realaudio": "tcp/554",
+    "junos-rip": "udp/520",
+    "junos-rsh": "tcp/514",
+    "junos-rtsp": "tcp/554",
+    "junos-sccp": "tcp/2000",
+    "junos-sctp-any": "sctp",
+    "junos-sip": "udp/5060 tcp/5060",
+    "junos-smb": "tcp/139 tcp/445",
+    "junos-smb-session": "tcp/445",
+    "junos-smtp": "tcp/25",
+    "junos-smtps": "tcp/465",
+    "junos-snmp-agentx": "tcp/705",
+    "junos-snmp-get": "udp/161",
+    "junos-snmp-get-next": "udp/161",
+    "junos-snmp-response": "udp/161",
+    "junos-snmp-trap": "udp/162",
+    "junos-sql-monitor": "udp/1434",
+    "junos-sqlnet-v1": "tcp/1525",
+    "junos-sqlnet-v2": "tcp/1521",
+    "junos-ssh": "tcp/22",
+    "junos-stun": "udp/3478 tcp/3478",
+    "junos-sun-rpc-portmap-tcp": "tcp/111",
+    "junos-sun-rpc-portmap-udp": "udp/111",
+    "junos-sun-rpc-tcp": "tcp/111",
+    "junos-sun-rpc-udp": "udp/111",
+    "junos-syslog": "udp/514",
+    "junos-talk": "udp/517",
+    "junos-tcp-any": "tcp/0-65535",
+    "junos-telnet": "tcp/23",
+    "junos-tftp": "udp/69",
+    "junos-udp-any": "udp/0-65535",
+    "junos-uucp": "udp/540",
+    "junos-vdo-live": "udp/7000-7010",
+    "junos-vnc": "tcp/5800 tcp/5900",
+    "junos-wais": "tcp/210",
+    "junos-who": "udp/513",
+    "junos-whois": "tcp/43",
+    "junos-winframe": "tcp/1494",
+    "junos-wxcontrol": "tcp/3578",
+    "junos-x-windows": "tcp/6000-6063",
+    "junos-xnm-clear-text": "tcp/3221",
+    "junos-xnm-ssl": "tcp/3220",
+    "junos-ymsg": "tcp/5050",
+}
+
+JUNOS_DEFAULT_APPLICATION_SETS = {
+    "junos-cifs": ["junos-netbios-session", "junos-smb-session"],
+    "junos-ms-rpc": ["junos-ms-rpc-tcp", "junos-ms-rpc-udp"],
+    "junos-sun-rpc": ["junos-sun-rpc-tcp", "junos-sun-rpc-udp"],
+    "junos-routing-inbound": ["junos-bgp", "junos-ospf", "junos-rip", "junos-ldp-tcp", "junos-ldp-udp"],
+}
+
+_junos_defaults = None
+
+def protocol_number(name):
+    if name in PROTOCOL_NUMBERS:
+        return PROTOCOL_NUMBERS[name]
+    return int(name)
+
+def port_range(text):
+    low, _, high = text.partition("-")
+    low = PORT_NAMES[low] if low in PORT_NAMES else int(low)
+    high = (PORT_NAMES[high] if high in PORT_NAMES else int(high)) if high else low
+    return low, high
+
+def service_interval(protocol, low=0, high=65535):
+    return ((protocol << 16) | low, (protocol << 16) | high)
+
+def service_key(protocol, port=0):
+    if isinstance(protocol, str):
+        protocol = protocol_number(protocol)
+    return (protocol << 16) | port
+
+# Intervals for one protocol/destination-port pair; no protocol means any
+def term_intervals(protocol, port):
+    if not protocol or protocol == "any":
+        return ANY_SERVICE
+    if not port:
+        return [service_interval(protocol_number(protocol))]
+    return [service_interval(protocol_number(protocol), *port_range(port))]
+
+# Applications carry either a single protocol/port or a list of terms
+def application_intervals(node):
+    terms = branch(node, "term")
+    if not terms:
+        terms = {None: node}
+    intervals = []
+    for term in terms.values():
+        if not isinstance(term, dict):
+            continue
+        protocol = next(iter(leaf_values(term.get("protocol"))), None)
+        ports = leaf_values(term.get("destination-port")) or [None]
+        for port in ports:
+            intervals.extend(term_intervals(protocol, port))
+    return merge_intervals(intervals)
+
+def junos_default_applications():
+    global _junos_defaults
+    if _junos_defaults is None:
+        table = {}
+        for name, spec in JUNOS_DEFAULT_APPLICATIONS.items():
+            intervals = []
+            for term in spec.split():
+                protocol, _, port = term.partition("/")
+                intervals.extend(term_intervals(protocol, port))
+            table[name] = merge_intervals(intervals)
+        for name, members in JUNOS_DEFAULT_APPLICATION_SETS.items():
+            table[name] = merge_intervals([i for member in members for i in table[member]])
+        _junos_defaults = table
+    return _junos_defaults
+
+def load_applications(config):
+    applications = {}
+    for name, node in branch(config, "applications", "application").items():
+        try:
+            applications[name] = application_intervals(node)
+        except (KeyError, ValueError):
+            applications[name] = None
+
+    application_sets = {}
+    sets = branch(config, "applications", "application-set")
+    for name in sets:
+        members = branch(sets, name)
+        application_sets[name] = (
+            leaf_values(members.get("application")) + leaf_values(members.get("application-set"))
+        )
+
+    return applications, application_sets
+
+# Flatten application-sets once with memoization, same approach as address-sets
+def flatten_application_sets(applications, application_sets):
+    resolved = {name: intervals or [] for name, intervals in applications.items()}
+    unresolved = {name for name, intervals in applications.items() if intervals is None}
+    visiting = set()
+
+    def resolve_member(name):
+        if name in resolved:
+            return resolved[name]
+        if name in application_sets:
+            return resolve_set(name)
+        if name == "any":
+            return ANY_SERVICE
+        if name in junos_default_applications():
+            return junos_default_applications()[name]
+        unresolved.add(name)
+        return []
+
+    def resolve_set(name):
+        if name in visiting:
+            print(f"Warning: application-set cycle through '{name}'")
+            return []
+        visiting.add(name)
+        intervals = [i for member in application_sets[name] for i in resolve_member(member)]
+        visiting.discard(name)
+        resolved[name] = merge_intervals(intervals)
+        return resolved[name]
+
+    for name in application_sets:
+        resolve_member(name)
+
+    return resolved, unresolved
+
+def build_application_resolver(config):
+    applications, application_sets = load_applications(config)
+    resolved, unresolved = flatten_application_sets(applications, application_sets)
+    return {"resolved": resolved, "unresolved": unresolved}
+
+# Names that are neither configured nor predefined (a junos-* name missing
+# from the table above included) are recorded in resolver["unresolved"]
+def resolve_application_name(resolver, name):
+    if name == "any":
+        return ANY_SERVICE
+    if name in resolver["resolved"]:
+        return resolver["resolved"][name]
+    if name in junos_default_applications():
+        return junos_default_applications()[name]
+    resolver["unresolved"].add(name)
+    return []
+
+def format_service_interval(start, end):
+    protocol = start >> 16
+    low, high = start & 0xffff, end & 0xffff
+    if end >> 16 != protocol:
+        return f"{protocol}-{end >> 16}/any"
+    if (low, high) == (0, 65535):
+        return f"{protocol}/any"
+    return f"{protocol}/{low}" if low == high else f"{protocol}/{low}-{high}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve SRX applications and application-sets of a converted config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', default='applications.json', help='Path to write the resolved applications to')
+    args = parser.parse_args()
+
+    try:
+        resolver = build_application_resolver(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    output = {
+        name: [format_service_interval(start, end) for start, end in intervals]
+        for name, intervals in resolver["resolved"].items()
+    }
+    with open(args.output_file, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Successfully resolved {len(output)} applications to {args.output_file}")
+
+    for name in sorted(resolver["unresolved"]):
+        print(f"Warning: could not resolve application '{name}'")
+
+if __name__ == "__main__":
+    main()
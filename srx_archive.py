@@ -0,0 +1,239 @@
+import json
+import zlib
+import struct
+import sqlite3
+import hashlib
+import argparse
+import datetime
+import functools
+
+from juniper_srx_set_to_json import load_json_config
+from srx_search import find_json_files, device_names
+
+# Every non-empty dict of a converted tree is stored once as an object
+# addressed by the sha256 of its encoded entries. Children are referenced by
+# their binary digest (Merkle style), so a hierarchy that is identical across
+# snapshots or devices is stored once no matter how often it appears. Large
+# dicts are split into content-defined chunks so one changed entry rewrites
+# one chunk, not the whole dict. The objects new to a snapshot are appended
+# to one pack and compressed together, since tiny objects compress badly on
+# their own.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packs (id INTEGER PRIMARY KEY, data BLOB);
+CREATE TABLE IF NOT EXISTS objects (
+    hash BLOB PRIMARY KEY, pack INTEGER, offset INTEGER, length INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    device TEXT, label TEXT, root TEXT, size INTEGER, created TEXT, PRIMARY KEY (device, label)
+);
+"""
+
+# Average entries per chunk; a chunk ends after an entry whose boundary hash
+# is a multiple of it, so inserting a key only moves the chunk it lands in
+CHUNK_ENTRIES = 64
+
+# Encoded dicts up to this size are embedded in their parent
+INLINE_BYTES = 512
+
+ENTRY_HEADER = struct.Struct(">IcI")
+
+def open_archive(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+# Entries are (key, "r", child digest) and (key, "d", encoded child entries)
+# for subtrees, (key, "v", value) for leaves and ("", "c", chunk digest) for a
+# chunk of a large dict's entries
+def encode_entries(entries):
+    parts = []
+    for key, kind, payload in entries:
+        key = key.encode()
+        if kind == "v":
+            payload = json.dumps(payload, separators=(",", ":")).encode()
+        parts.append(ENTRY_HEADER.pack(len(key), kind.encode(), len(payload)) + key + payload)
+    return b"".join(parts)
+
+def decode_entries(data):
+    entries = []
+    offset = 0
+    while offset < len(data):
+        key_length, kind, length = ENTRY_HEADER.unpack_from(data, offset)
+        offset += ENTRY_HEADER.size
+        key = data[offset:offset + key_length].decode()
+        payload = data[offset + key_length:offset + key_length + length]
+        offset += key_length + length
+        kind = kind.decode()
+        entries.append((key, kind, json.loads(payload) if kind == "v" else payload))
+    return entries
+
+def new_pack():
+    return {"data": bytearray(), "objects": {}}
+
+def put_object(connection, pack, data, stats):
+    digest = hashlib.sha256(data).digest()
+    stats["nodes"] += 1
+    if digest not in pack["objects"] and connection.execute(
+        "SELECT 1 FROM objects WHERE hash = ?", (digest,)
+    ).fetchone() is None:
+        pack["objects"][digest] = (len(pack["data"]), len(data))
+        pack["data"] += data
+        stats["new_blobs"] += 1
+    return digest
+
+# Keys decide where chunks of dict entries end, so editing a value leaves
+# the boundaries alone; chunk references are split by their digest
+def chunk_boundary(entry):
+    key, kind, payload = entry
+    return zlib.crc32(key.encode() + (payload if kind == "c" else b"")) % CHUNK_ENTRIES == 0
+
+def chunk_entries(connection, pack, entries, stats):
+    while len(entries) > CHUNK_ENTRIES:
+        chunks = [[]]
+        for entry in entries:
+            chunks[-1].append(entry)
+            if chunk_boundary(entry):
+                chunks.append([])
+        if len(chunks) - (not chunks[-1]) >= len(entries):
+            break
+        entries = [
+            ("", "c", put_object(connection, pack, encode_entries(chunk), stats)) for chunk in chunks if chunk
+        ]
+    return entries
+
+# Store a dict and return how its parent refers to it: small unchunked dicts
+# are embedded in the parent as ("d", encoded entries), since a digest per
+# tiny dict would cost more than the dict; anything else is ("r", digest)
+def store_node(connection, pack, node, stats):
+    entries = []
+    for key, child in node.items():
+        if isinstance(child, dict) and child:
+            entries.append((key, *store_node(connection, pack, child, stats)))
+        else:
+            entries.append((key, "v", child))
+    entries = chunk_entries(connection, pack, entries, stats)
+    data = encode_entries(entries)
+    if len(data) <= INLINE_BYTES and all(entry[1] != "c" for entry in entries):
+        return "d", data
+    return "r", put_object(connection, pack, data, stats)
+
+def write_pack(connection, pack, stats):
+    if not pack["objects"]:
+        return
+    data = zlib.compress(bytes(pack["data"]), 9)
+    pack_id = connection.execute("INSERT INTO packs (data) VALUES (?)", (data,)).lastrowid
+    connection.executemany(
+        "INSERT INTO objects VALUES (?, ?, ?, ?)",
+        ((digest, pack_id, offset, length) for digest, (offset, length) in pack["objects"].items()),
+    )
+    stats["new_bytes"] += len(data)
+
+def store_snapshot(connection, device, label, config):
+    stats = {"nodes": 0, "new_blobs": 0, "new_bytes": 0}
+    pack = new_pack()
+    with connection:
+        kind, root = store_node(connection, pack, config, stats)
+        if kind == "d":
+            root = put_object(connection, pack, root, stats)
+        root = root.hex()
+        write_pack(connection, pack, stats)
+        connection.execute(
+            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+            (device, label, root, len(json.dumps(config)), datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        )
+    return root, stats
+
+# Packs are decompressed whole, so the last few are kept while a tree is read
+@functools.lru_cache(maxsize=8)
+def pack_data(connection, pack_id):
+    return zlib.decompress(connection.execute("SELECT data FROM packs WHERE id = ?", (pack_id,)).fetchone()[0])
+
+# The entries of a dict, with its chunks expanded
+def load_entries(connection, digest):
+    row = connection.execute("SELECT pack, offset, length FROM objects WHERE hash = ?", (digest,)).fetchone()
+    if row is None:
+        raise KeyError(f"missing object {digest.hex()}")
+    pack_id, offset, length = row
+    entries = []
+    for entry in decode_entries(pack_data(connection, pack_id)[offset:offset + length]):
+        if entry[1] == "c":
+            entries.extend(load_entries(connection, entry[2]))
+        else:
+            entries.append(entry)
+    return entries
+
+def materialize(connection, entries):
+    return {
+        key: materialize(connection, child_entries(connection, kind, value)) if kind != "v" else value
+        for key, kind, value in entries
+    }
+
+def child_entries(connection, kind, payload):
+    return load_entries(connection, payload) if kind == "r" else decode_entries(payload)
+
+# Rebuild a snapshot, or only the subtree at path: just the objects along the
+# path and below it are read
+def load_snapshot(connection, device, label, path=()):
+    row = connection.execute("SELECT root FROM snapshots WHERE device = ? AND label = ?", (device, label)).fetchone()
+    if row is None:
+        return None
+    entries = load_entries(connection, bytes.fromhex(row[0]))
+    for position, key in enumerate(path):
+        entry = next((e for e in entries if e[0] == key), None)
+        if entry is None:
+            return None
+        if entry[1] == "v":
+            return entry[2] if position == len(path) - 1 else None
+        entries = child_entries(connection, entry[1], entry[2])
+    return materialize(connection, entries)
+
+def archive_stats(connection):
+    snapshots, logical = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM snapshots").fetchone()
+    blobs = connection.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+    stored = connection.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM packs").fetchone()[0]
+    return {"snapshots": snapshots, "logical_bytes": logical, "blobs": blobs, "stored_bytes": stored}
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed archive of converted SRX config snapshots')
+    parser.add_argument('--archive', default='srx_archive.db', help='Path of the archive database')
+    parser.add_argument('--store', metavar='SOURCE', help='Converted JSON file, directory or glob to archive')
+    parser.add_argument('--label', default=datetime.date.today().isoformat(), help='Snapshot label (default: today)')
+    parser.add_argument('--restore', metavar='DEVICE', help='Rebuild the snapshot of this device with --label')
+    parser.add_argument('--path', nargs='*', default=[], help='With --restore, only rebuild this subtree')
+    parser.add_argument('-o', '--output-file', default='restored.json', help='Where --restore writes the JSON')
+    parser.add_argument('--stats', action='store_true', help='Show snapshot and storage totals')
+    args = parser.parse_args()
+
+    connection = open_archive(args.archive)
+
+    if args.store:
+        paths = sorted(find_json_files(args.store))
+        for path, device in device_names(paths, args.store).items():
+            try:
+                config = load_json_config(path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {path}: {str(e)}")
+                continue
+            root, stats = store_snapshot(connection, device, args.label, config)
+            print(f"Stored {device}@{args.label}: {stats['nodes']} nodes, "
+                  f"{stats['new_blobs']} new blobs ({stats['new_bytes']} bytes), root {root[:12]}")
+
+    if args.restore:
+        config = load_snapshot(connection, args.restore, args.label, args.path)
+        if config is None:
+            print(f"Error: no snapshot {args.restore}@{args.label} at path '{' '.join(args.path)}'")
+        else:
+            with open(args.output_file, 'w') as f:
+                json.dump(config, f, indent=4)
+            print(f"Successfully restored {args.restore}@{args.label} to {args.output_file}")
+
+    if args.stats:
+        stats = archive_stats(connection)
+        ratio = stats["logical_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+        print(f"{stats['snapshots']} snapshots, {stats['logical_bytes']} logical bytes stored as "
+              f"{stats['blobs']} blobs in {stats['stored_bytes']} bytes ({ratio:.1f}x)")
+
+    connection.close()
+
+if __name__ == "__main__":
+    main()
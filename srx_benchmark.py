@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from juniper_srx_set_to_json import set_to_json
+from srx_schema import compile_schema
+from srx_generate import counts_for_lines, write_config
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+def convert_plain(input_file, output_file):
+    set_to_json(input_file, output_file)
+
+def convert_schema(input_file, output_file):
+    set_to_json(input_file, output_file, schema=compile_schema())
+
+PARSER_MODES = {
+    "plain": convert_plain,
+    "schema": convert_schema,
+}
+
+# Runs in a fresh process so ru_maxrss is the peak of this conversion alone
+def run_mode(mode, input_file, output_file):
+    started = time.perf_counter()
+    PARSER_MODES[mode](input_file, output_file)
+    seconds = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return seconds, peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+def count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+def benchmark_file(input_file, modes, repeat=1):
+    lines = count_lines(input_file)
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = os.path.join(temp_dir, "output.json")
+        for mode in modes:
+            best = None
+            for _ in range(repeat):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    seconds, peak_rss = executor.submit(run_mode, mode, input_file, output_file).result()
+                if best is None or seconds < best[0]:
+                    best = (seconds, peak_rss)
+            seconds, peak_rss = best
+            results.append({
+                "mode": mode,
+                "input_file": input_file,
+                "lines": lines,
+                "seconds": seconds,
+                "lines_per_second": lines / seconds if seconds else 0,
+                "peak_rss_bytes": peak_rss,
+                "output_bytes": os.path.getsize(output_file),
+            })
+    return results
+
+def run_benchmarks(sizes, modes, work_dir, seed=0, repeat=1, inputs=()):
+    os.makedirs(work_dir, exist_ok=True)
+    paths = list(inputs)
+    for size in sizes:
+        path = os.path.join(work_dir, f"synthetic_{size}_{seed}.set")
+        # Generated files are deterministic, so an existing one is reused
+        if not os.path.exists(path):
+            write_config(path, seed=seed, **counts_for_lines(size))
+        paths.append(path)
+
+    runs = []
+    for path in paths:
+        for result in benchmark_file(path, modes, repeat):
+            print(f"{os.path.basename(path)} [{result['mode']}]: {result['lines']} lines in {result['seconds']:.2f}s "
+                  f"({result['lines_per_second']:,.0f} lines/sec), peak RSS {result['peak_rss_bytes'] / 2**20:.1f} MiB, "
+                  f"output {result['output_bytes'] / 2**20:.1f} MiB")
+            runs.append(result)
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "runs": runs,
+    }
+
+# Print the change in throughput against an earlier results file
+def compare_results(previous, current):
+    baseline = {(os.path.basename(run["input_file"]), run["mode"]): run for run in previous["runs"]}
+    for run in current["runs"]:
+        before = baseline.get((os.path.basename(run["input_file"]), run["mode"]))
+        if before and before["lines_per_second"]:
+            change = run["lines_per_second"] / before["lines_per_second"] - 1
+            print(f"{os.path.basename(run['input_file'])} [{run['mode']}]: {change:+.1%} lines/sec, "
+                  f"peak RSS {run['peak_rss_bytes'] - before['peak_rss_bytes']:+,} bytes")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark set_to_json on synthetic SRX configs')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, help='Line counts of the generated configs')
+    parser.add_argument('--input', nargs='*', default=[], help='Existing set files to benchmark as well')
+    parser.add_argument('--modes', nargs='*', default=list(PARSER_MODES), choices=list(PARSER_MODES), help='Parser modes to run')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per mode; the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated configs')
+    parser.add_argument('--work-dir', default='benchmark_inputs', help='Directory for the generated configs')
+    parser.add_argument('-o', '--output-file', default='benchmark_results.json', help='Path to write the results to')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.modes, args.work_dir, args.seed, args.repeat, args.input)
+    with open(args.output_file, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to {args.output_file}")
+
+    if args.compare:
+        try:
+            with open(args.compare, 'r') as f:
+                compare_results(json.load(f), results)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading {args.compare}: {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import json
+import argparse
+
+import numpy as np
+
+from juniper_srx_set_to_json import load_json_config
+from srx_policies import extract_policies
+from srx_addresses import build_address_resolver, resolve_address_name, merge_intervals, PREDEFINED_ADDRESSES
+from srx_applications import build_application_resolver, resolve_application_name
+from srx_match import resolve_names, policy_addresses
+from srx_search import find_json_files, device_names
+
+ACTIONS = ["", "permit", "deny", "reject"]
+MEMBER_FIELDS = ("source_address", "destination_address", "application")
+FLAG_FIELDS = ("global", "log_init", "log_close", "count")
+DICTIONARY_FILE = "dictionaries.json"
+
+# Names that make a member field match everything. any-ipv4 and any-ipv6
+# count as any address: a permit from any-ipv4 to any-ipv4 opens the whole
+# IPv4 space and is reported with the any-any policies. Applications only
+# have "any".
+ANY_NAMES = {
+    "source_address": set(PREDEFINED_ADDRESSES),
+    "destination_address": set(PREDEFINED_ADDRESSES),
+    "application": {"any"},
+}
+
+# Grows the string dictionaries while rows are collected
+def encoder(values):
+    codes = {value: position for position, value in enumerate(values)}
+
+    def encode(value):
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    return encode
+
+def split_address(value):
+    return value >> 64, value & 0xffffffffffffffff
+
+# Collect the policies of every device as columns. Names are dictionary
+# encoded, member lists and intervals are stored CSR style (an offsets array
+# with one entry per policy plus a flat values array). Addresses are 128-bit,
+# so each endpoint is split into high and low uint64 words. device_for maps
+# each path to its device name (see srx_search.device_names).
+def build_columns(paths, device_for=None):
+    device_for = device_for or device_names(paths)
+    dictionaries = {"devices": [], "zones": [None], "names": [], "actions": list(ACTIONS)}
+    encode_device = encoder(dictionaries["devices"])
+    encode_zone = encoder(dictionaries["zones"])
+    encode_name = encoder(dictionaries["names"])
+
+    rows = {key: [] for key in ("device", "from_zone", "to_zone", "name", "sequence", "action")}
+    rows.update({field: [] for field in FLAG_FIELDS})
+    rows.update({f"any_{field}": [] for field in MEMBER_FIELDS})
+    members = {field: [] for field in MEMBER_FIELDS}
+    member_counts = {field: [] for field in MEMBER_FIELDS}
+    addresses = {"source_address": [], "destination_address": []}
+    address_counts = {"source_address": [], "destination_address": []}
+    services = []
+    service_counts = []
+
+    for path in paths:
+        try:
+            config = load_json_config(path)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading {path}: {str(e)}")
+            continue
+        device = encode_device(device_for[path])
+        address_resolver = build_address_resolver(config)
+        application_resolver = build_application_resolver(config)
+
+        for policy in extract_policies(config):
+            rows["device"].append(device)
+            rows["from_zone"].append(encode_zone(policy["from_zone"]))
+            rows["to_zone"].append(encode_zone(policy["to_zone"]))
+            rows["name"].append(encode_name(policy["name"]))
+            rows["sequence"].append(policy["sequence"])
+            rows["action"].append(ACTIONS.index(policy["action"]) if policy["action"] in ACTIONS else 0)
+            for field in FLAG_FIELDS:
+                rows[field].append(policy[field])
+            for field in MEMBER_FIELDS:
+                names = policy[field]
+                members[field].extend(encode_name(name) for name in names)
+                member_counts[field].append(len(names))
+                rows[f"any_{field}"].append(
+                    any(name in ANY_NAMES[field] for name in names) and not policy.get(f"{field}_excluded")
+                )
+
+            for field, zone in (("source_address", policy["from_zone"]), ("destination_address", policy["to_zone"])):
+                intervals = policy_addresses(
+                    policy, field, lambda n: resolve_address_name(address_resolver, zone, n)
+                )
+                addresses[field].extend(split_address(start) + split_address(end) for start, end in intervals)
+                address_counts[field].append(len(intervals))
+            intervals = merge_intervals(resolve_names(
+                policy["application"], lambda n: resolve_application_name(application_resolver, n)
+            ))
+            services.extend(intervals)
+            service_counts.append(len(intervals))
+
+    def offsets(counts):
+        return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).astype(np.int64)
+
+    columns = {
+        "device": np.array(rows["device"], dtype=np.int32),
+        "from_zone": np.array(rows["from_zone"], dtype=np.int32),
+        "to_zone": np.array(rows["to_zone"], dtype=np.int32),
+        "name": np.array(rows["name"], dtype=np.int32),
+        "sequence": np.array(rows["sequence"], dtype=np.int32),
+        "action": np.array(rows["action"], dtype=np.int8),
+        "service_offsets": offsets(service_counts),
+        "service_intervals": np.array(services, dtype=np.int64).reshape(-1, 2),
+    }
+    for field in FLAG_FIELDS + tuple(f"any_{f}" for f in MEMBER_FIELDS):
+        columns[field] = np.array(rows[field], dtype=np.bool_)
+    for field in MEMBER_FIELDS:
+        columns[f"{field}_offsets"] = offsets(member_counts[field])
+        columns[f"{field}_names"] = np.array(members[field], dtype=np.int32)
+    for field in addresses:
+        columns[f"{field}_interval_offsets"] = offsets(address_counts[field])
+        columns[f"{field}_intervals"] = np.array(addresses[field], dtype=np.uint64).reshape(-1, 4)
+
+    return columns, dictionaries
+
+# One .npy file per column so every column can be memory-mapped on load
+def write_columns(output_dir, columns, dictionaries):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in columns.items():
+        np.save(os.path.join(output_dir, f"{name}.npy"), array)
+    with open(os.path.join(output_dir, DICTIONARY_FILE), 'w') as f:
+        json.dump(dictionaries, f)
+
+def load_columns(output_dir):
+    columns = {
+        entry.name[:-4]: np.load(entry.path, mmap_mode='r')
+        for entry in os.scandir(output_dir) if entry.name.endswith(".npy")
+    }
+    with open(os.path.join(output_dir, DICTIONARY_FILE), 'r') as f:
+        dictionaries = json.load(f)
+    return columns, dictionaries
+
+def fleet_stats(columns, dictionaries, top=10):
+    zones = dictionaries["zones"]
+    total = len(columns["action"])
+    pairs = columns["from_zone"].astype(np.int64) * len(zones) + columns["to_zone"]
+    unique_pairs, counts = np.unique(pairs, return_counts=True)
+    busiest = np.argsort(counts)[::-1][:top]
+    any_any = (columns["any_source_address"] & columns["any_destination_address"] &
+               columns["any_application"] & (columns["action"] == ACTIONS.index("permit")))
+    logged = columns["log_init"] | columns["log_close"]
+    return {
+        "policies": total,
+        "devices": len(dictionaries["devices"]),
+        "zone_pairs": len(unique_pairs),
+        "busiest_zone_pairs": [
+            (zones[pair // len(zones)] or "global", zones[pair % len(zones)] or "global", int(count))
+            for pair, count in zip(unique_pairs[busiest], counts[busiest])
+        ],
+        "any_any_permit": int(any_any.sum()),
+        "log_coverage": float(logged.mean()) if total else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Export SRX policy tables as memory-mappable columnar arrays')
+    parser.add_argument('--export', metavar='SOURCE', help='Directory or glob of converted JSON files to export')
+    parser.add_argument('-o', '--output-dir', default='policy_columns', help='Directory holding the column files')
+    parser.add_argument('--stats', action='store_true', help='Print fleet statistics from the column files')
+    args = parser.parse_args()
+
+    if args.export:
+        paths = sorted(find_json_files(args.export))
+        columns, dictionaries = build_columns(paths, device_names(paths, args.export))
+        write_columns(args.output_dir, columns, dictionaries)
+        print(f"Exported {len(columns['action'])} policies from {len(dictionaries['devices'])} devices to {args.output_dir}")
+
+    if args.stats:
+        try:
+            columns, dictionaries = load_columns(args.output_dir)
+        except FileNotFoundError:
+            print(f"Error: no column files found in {args.output_dir}")
+            return
+        stats = fleet_stats(columns, dictionaries)
+        print(f"{stats['policies']} policies on {stats['devices']} devices across {stats['zone_pairs']} zone pairs")
+        print(f"Any-any permit policies: {stats['any_any_permit']}")
+        print(f"Log coverage: {stats['log_coverage']:.1%}")
+        for from_zone, to_zone, count in stats["busiest_zone_pairs"]:
+            print(f"  {from_zone} -> {to_zone}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import heapq
+import argparse
+
+from juniper_srx_set_to_json import load_json_config, branch, leaf_values, format_statement
+from srx_addresses import load_address_books, int_to_ip
+from srx_unused import build_reference_graph, object_statement
+
+# Group address entries by their interval; any group with more than one name
+# is a set of exact duplicates
+def find_duplicates(addresses):
+    groups = {}
+    for key, intervals in addresses.items():
+        if intervals:
+            groups.setdefault(intervals[0], []).append(key)
+    return {interval: sorted(keys) for interval, keys in groups.items() if len(keys) > 1}
+
+# Sort by start (widest first) and sweep, keeping the intervals still open in
+# a heap ordered by end. Every open interval overlaps the current one; it
+# contains it when it also ends at or after it. Duplicates are swept once.
+def find_overlaps(addresses):
+    representatives = {}
+    for key, intervals in addresses.items():
+        if intervals:
+            representatives.setdefault(intervals[0], key)
+    containment = []
+    overlaps = []
+    active = []
+    for start, end in sorted(representatives, key=lambda i: (i[0], -i[1])):
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        key = representatives[(start, end)]
+        for other_end, other_key in active:
+            if other_end >= end:
+                containment.append((other_key, key))
+            else:
+                overlaps.append((other_key, key))
+        heapq.heappush(active, (end, key))
+    return containment, overlaps
+
+def policy_match(policy):
+    _, from_zone, to_zone, name = policy
+    if from_zone == "global":
+        return ("security", "policies", "global", "policy", name, "match")
+    return ("security", "policies", "from-zone", from_zone, "to-zone", to_zone, "policy", name, "match")
+
+# Commands that point every reference of a duplicate at the name that is kept
+# and then delete the duplicate. Only duplicates within one address-book are
+# merged, since other books are visible from different zones.
+def cleanup_commands(config, duplicates):
+    _, referrers, _, _ = build_reference_graph(config)
+    commands = []
+    for keys in duplicates.values():
+        by_book = {}
+        for book, name in keys:
+            by_book.setdefault(book, []).append(name)
+        for book, names in by_book.items():
+            keep = names[0]
+            for name in names[1:]:
+                key = ("address", book, name)
+                # A referrer naming the duplicate in several places is listed once per reference
+                for referrer in dict.fromkeys(referrers.get(key, [])):
+                    if referrer[0] == "address-set":
+                        prefix = object_statement(config, referrer)
+                        fields = ["address"]
+                    elif referrer[0] == "policy":
+                        prefix = policy_match(referrer)
+                        fields = [f for f in ("source-address", "destination-address")
+                                  if name in leaf_values(branch(config, *prefix).get(f))]
+                    else:
+                        _, nat_type, rule_set, rule = referrer
+                        prefix = ("security", "nat", nat_type, "rule-set", rule_set, "rule", rule, "match")
+                        fields = [f for f in ("source-address-name", "destination-address-name")
+                                  if name in leaf_values(branch(config, *prefix).get(f))]
+                    for field in fields:
+                        commands.append(f"set {format_statement(prefix + (field, keep))}")
+                        commands.append(f"delete {format_statement(prefix + (field, name))}")
+                commands.append(f"delete {format_statement(object_statement(config, key))}")
+    return commands
+
+def describe_interval(interval):
+    start, end = interval
+    return f"{int_to_ip(start)}-{int_to_ip(end)}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Find duplicate and overlapping SRX address-book entries')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', help='Write the report as JSON to this file')
+    parser.add_argument('--cleanup', action='store_true', help='Print set/delete commands that merge duplicates')
+    args = parser.parse_args()
+
+    try:
+        config = load_json_config(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    addresses, _, _ = load_address_books(config)
+    duplicates = find_duplicates(addresses)
+
+    if args.cleanup:
+        for command in cleanup_commands(config, duplicates):
+            print(command)
+        return
+
+    containment, overlaps = find_overlaps(addresses)
+    for interval, keys in duplicates.items():
+        print(f"Duplicate {describe_interval(interval)}: {', '.join(f'{book}/{name}' for book, name in keys)}")
+    for outer, inner in containment:
+        print(f"Contained: {inner[0]}/{inner[1]} in {outer[0]}/{outer[1]}")
+    for first, second in overlaps:
+        print(f"Overlap: {first[0]}/{first[1]} and {second[0]}/{second[1]}")
+    print(f"{len(duplicates)} duplicate groups, {len(containment)} contained and {len(overlaps)} overlapping entries")
+
+    if args.output_file:
+        report = {
+            "duplicates": [
+                {"range": describe_interval(interval), "objects": [list(key) for key in keys]}
+                for interval, keys in duplicates.items()
+            ],
+            "contained": [{"outer": list(outer), "inner": list(inner)} for outer, inner in containment],
+            "overlapping": [[list(first), list(second)] for first, second in overlaps],
+        }
+        with open(args.output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from juniper_srx_set_to_json import set_to_json
+
+MANIFEST_NAME = "fleet_manifest.json"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# A directory means every *.set file in it, anything else is used as a glob
+def find_set_files(source):
+    pattern = os.path.join(source, "*.set") if os.path.isdir(source) else source
+    return [path for path in glob.glob(pattern) if os.path.isfile(path)]
+
+# With a root, the input's path below it is mirrored in the output directory,
+# so fw.set files from different sites do not overwrite each other
+def output_path_for(input_file, output_dir, root=None):
+    relative = os.path.relpath(input_file, root) if root else os.path.basename(input_file)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".json")
+
+# The fixed directory that paths of a source are mirrored below: the source
+# directory itself, or the part of a glob before its first wildcard. It
+# depends only on the source, never on which files matched.
+def source_root(source):
+    if os.path.isdir(source):
+        return source
+    parts = []
+    for part in os.path.dirname(source).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    if parts == [""]:
+        return os.sep
+    return os.sep.join(parts) or "."
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"files": {}}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print(f"Warning: {path} is not valid JSON, converting everything")
+        return {"files": {}}
+
+# Runs in a worker process: hash the input and convert it unless the hash
+# matches a previous successful run and its recorded output is still there.
+# An output recorded at another path (the source was given differently) is
+# moved rather than converted again. A failed conversion removes the stale
+# output so it is not mistaken for this input.
+def convert_one(input_file, output_file, previous):
+    started = time.perf_counter()
+    entry = {"output": output_file, "size": os.path.getsize(input_file)}
+    previous_output = previous.get("output", output_file)
+    try:
+        entry["sha256"] = file_sha256(input_file)
+        if (entry["sha256"] == previous.get("sha256") and previous.get("status") in ("converted", "unchanged")
+                and os.path.exists(previous_output)):
+            if previous_output != output_file:
+                os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+                os.replace(previous_output, output_file)
+            entry["status"] = "unchanged"
+        else:
+            if previous_output != output_file and os.path.exists(previous_output):
+                os.remove(previous_output)
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            set_to_json(input_file, output_file)
+            entry["status"] = "converted"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = str(e)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+    entry["seconds"] = round(time.perf_counter() - started, 4)
+    return input_file, entry
+
+def convert_fleet(source, output_dir, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)["files"]
+    # Largest first so a few huge configs do not end up running last
+    files = sorted(find_set_files(source), key=os.path.getsize, reverse=True)
+    root = source_root(source)
+
+    started = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(convert_one, path, output_path_for(path, output_dir, root), previous.get(path, {}))
+            for path in files
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            path, entry = future.result()
+            results[path] = entry
+            if entry["status"] == "failed":
+                print(f"Error converting {path}: {entry['error']}")
+            elif i % 100 == 0 or i == len(files):
+                print(f"Processed {i}/{len(files)} files")
+
+    manifest = {
+        "generated": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "source": source,
+        "seconds": round(time.perf_counter() - started, 4),
+        "counts": {
+            status: sum(1 for entry in results.values() if entry["status"] == status)
+            for status in ("converted", "unchanged", "failed")
+        },
+        "files": {path: results[path] for path in files},
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a directory or glob of SRX set files to JSON in parallel')
+    parser.add_argument('source', help='Directory of *.set files or a glob pattern')
+    parser.add_argument('-o', '--output-dir', default='converted', help='Directory for the JSON files and the manifest')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    manifest = convert_fleet(args.source, args.output_dir, args.workers)
+    counts = manifest["counts"]
+    print(f"Converted {counts['converted']}, unchanged {counts['unchanged']}, failed {counts['failed']} "
+          f"in {manifest['seconds']}s; manifest written to {os.path.join(args.output_dir, MANIFEST_NAME)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import random
+import argparse
+
+from juniper_srx_set_to_json import format_statement
+
+DESCRIPTION_WORDS = ["web", "db", "backup", "legacy", "partner", "vpn", "dmz", "temporary", "migrated", "ticket"]
+APPLICATION_PORTS = [("tcp", "8080"), ("tcp", "8443"), ("tcp", "1521"), ("udp", "1812"), ("tcp", "9000-9100")]
+JUNOS_APPLICATIONS = ["junos-http", "junos-https", "junos-ssh", "junos-dns-udp", "junos-ntp", "junos-smtp"]
+
+# Rough share of the output lines each section gets when sizing by line count
+DEFAULT_SHARES = {"addresses": 0.3, "address_sets": 0.1, "policies": 0.6}
+
+# Object counts that produce roughly the requested number of lines
+def counts_for_lines(lines, zones=8, delete_ratio=0.02, description_ratio=0.2):
+    return {
+        "zones": zones,
+        "addresses": max(1, int(lines * DEFAULT_SHARES["addresses"] / (1 + description_ratio))),
+        "address_sets": max(1, int(lines * DEFAULT_SHARES["address_sets"] / 5.3)),
+        "policies": max(1, int(lines * DEFAULT_SHARES["policies"] / (7 + description_ratio))),
+        "delete_ratio": delete_ratio,
+        "description_ratio": description_ratio,
+    }
+
+def description(rng):
+    return " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(2, 5)))
+
+def address_name(index):
+    return f"h-{index}"
+
+def address_set_name(index):
+    return f"as-{index}"
+
+# Yield the set/delete lines of a synthetic config. The same seed and counts
+# always give the same lines, and nothing but the counts is held in memory,
+# so multi-million line configs can be streamed straight to a file.
+def generate_config(zones=8, addresses=1000, address_sets=100, policies=1000,
+                    delete_ratio=0.02, description_ratio=0.2, seed=0):
+    rng = random.Random(seed)
+    zone_names = [f"zone-{i}" for i in range(zones)]
+
+    def line(verb, *tokens):
+        return f"{verb} {format_statement(tokens)}"
+
+    for i, zone in enumerate(zone_names):
+        yield line("set", "security", "zones", "security-zone", zone, "interfaces", f"ge-0/0/{i}.0")
+        yield line("set", "security", "zones", "security-zone", zone, "host-inbound-traffic", "system-services", "ping")
+
+    custom_applications = []
+    for protocol, port in APPLICATION_PORTS:
+        name = f"app-{protocol}-{port}"
+        custom_applications.append(name)
+        yield line("set", "applications", "application", name, "protocol", protocol)
+        yield line("set", "applications", "application", name, "destination-port", port)
+    applications = custom_applications + JUNOS_APPLICATIONS
+
+    for i in range(addresses):
+        if rng.random() < 0.1:
+            yield line("set", "security", "address-book", "global", "address", address_name(i),
+                       f"10.{(i >> 8) & 0xff}.{i & 0xff}.0/24")
+        else:
+            yield line("set", "security", "address-book", "global", "address", address_name(i),
+                       f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}/32")
+        if rng.random() < description_ratio:
+            yield line("set", "security", "address-book", "global", "address", address_name(i),
+                       "description", description(rng))
+
+    # Sets may include earlier sets, which gives nesting without cycles
+    for i in range(address_sets):
+        for _ in range(rng.randint(3, 7)):
+            yield line("set", "security", "address-book", "global", "address-set", address_set_name(i),
+                       "address", address_name(rng.randrange(addresses)))
+        if i and rng.random() < 0.3:
+            yield line("set", "security", "address-book", "global", "address-set", address_set_name(i),
+                       "address-set", address_set_name(rng.randrange(i)))
+
+    def endpoint():
+        if address_sets and rng.random() < 0.3:
+            return address_set_name(rng.randrange(address_sets))
+        return address_name(rng.randrange(addresses))
+
+    for i in range(policies):
+        from_zone, to_zone = rng.sample(zone_names, 2) if zones > 1 else (zone_names[0], zone_names[0])
+        prefix = ("security", "policies", "from-zone", from_zone, "to-zone", to_zone, "policy", f"p-{i}")
+        if rng.random() < description_ratio:
+            yield line("set", *prefix, "description", description(rng))
+        sources = [endpoint() for _ in range(rng.randint(1, 3))]
+        for name in sources:
+            yield line("set", *prefix, "match", "source-address", name)
+        for _ in range(rng.randint(1, 2)):
+            yield line("set", *prefix, "match", "destination-address", endpoint())
+        for _ in range(rng.randint(1, 2)):
+            yield line("set", *prefix, "match", "application", rng.choice(applications))
+        yield line("set", *prefix, "then", "permit" if rng.random() < 0.8 else "deny")
+        yield line("set", *prefix, "then", "log", "session-close")
+        if rng.random() < delete_ratio:
+            if rng.random() < 0.5:
+                yield line("delete", *prefix, "match", "source-address", sources[0])
+            else:
+                yield line("delete", *prefix)
+
+def write_config(output_file, **counts):
+    lines = 0
+    with open(output_file, 'w') as f:
+        for text in generate_config(**counts):
+            f.write(text)
+            f.write("\n")
+            lines += 1
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic SRX set configuration')
+    parser.add_argument('-o', '--output-file', default='synthetic.set', help='Path of the set file to write')
+    parser.add_argument('--lines', type=int, help='Approximate number of lines; derives the object counts')
+    parser.add_argument('--zones', type=int, default=8, help='Number of security zones')
+    parser.add_argument('--addresses', type=int, default=1000, help='Number of address-book entries')
+    parser.add_argument('--address-sets', type=int, default=100, help='Number of address-sets')
+    parser.add_argument('--policies', type=int, default=1000, help='Number of policies')
+    parser.add_argument('--delete-ratio', type=float, default=0.02, help='Share of policies followed by a delete')
+    parser.add_argument('--description-ratio', type=float, default=0.2, help='Share of objects with a quoted description')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    if args.lines:
+        counts = counts_for_lines(args.lines, args.zones, args.delete_ratio, args.description_ratio)
+    else:
+        counts = {
+            "zones": args.zones, "addresses": args.addresses, "address_sets": args.address_sets,
+            "policies": args.policies, "delete_ratio": args.delete_ratio,
+            "description_ratio": args.description_ratio,
+        }
+    lines = write_config(args.output_file, seed=args.seed, **counts)
+    print(f"Wrote {lines} lines to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import re
+import csv
+import json
+import argparse
+
+from juniper_srx_set_to_json import load_json_config
+from srx_policies import extract_policies
+
+# One row of "show security policies hit-count":
+#  Index   From zone   To zone   Name   Policy count   Action
+HIT_COUNT_ROW_RE = re.compile(r'^\s*(\d+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\d+)\s+(\S+)\s*$')
+# The "detail" variants describe one policy per block
+DETAIL_POLICY_RE = re.compile(r'^\s*Policy:\s*([^,\s]+),\s*action-type:\s*([^,\s]+)')
+DETAIL_ZONES_RE = re.compile(r'^\s*From zone:\s*([^,\s]+),\s*To zone:\s*([^,\s]+)')
+DETAIL_HITS_RE = re.compile(r'^\s*(?:Policy lookups|Hit count|Policy count)\s*:?\s*(\d+)')
+
+# Zone names the CLI prints for global policies
+GLOBAL_ZONES = {"global", "junos-global", "any"}
+
+def policy_key(from_zone, to_zone, name):
+    if from_zone.lower() in GLOBAL_ZONES and to_zone.lower() in GLOBAL_ZONES:
+        return None, None, name
+    return from_zone, to_zone, name
+
+# Stream the lines of a hit-count dump (plain or detail, possibly several runs
+# in one batch.py log) into {(from_zone, to_zone, name): count}. Only the
+# current detail block is held, and later runs overwrite earlier counts.
+def parse_hit_counts(lines):
+    counts = {}
+    name = None
+    zones = None
+    for line in lines:
+        match = HIT_COUNT_ROW_RE.match(line)
+        if match:
+            _, from_zone, to_zone, policy, count, _ = match.groups()
+            counts[policy_key(from_zone, to_zone, policy)] = int(count)
+            continue
+        match = DETAIL_POLICY_RE.match(line)
+        if match:
+            name = match.group(1)
+            zones = ("global", "global")
+            continue
+        if name is None:
+            continue
+        match = DETAIL_ZONES_RE.match(line)
+        if match:
+            zones = match.groups()
+            continue
+        match = DETAIL_HITS_RE.match(line)
+        if match:
+            counts[policy_key(*zones, name)] = int(match.group(1))
+            name = None
+    return counts
+
+def load_hit_counts(path):
+    with open(path, 'r', errors='replace') as f:
+        return parse_hit_counts(f)
+
+# Join the counters to the policies of the converted config. Policies the dump
+# does not mention get None, counters without a configured policy are returned
+# separately.
+def join_hit_counts(device, config, counts):
+    rows = []
+    seen = set()
+    for policy in extract_policies(config):
+        key = (policy["from_zone"], policy["to_zone"], policy["name"])
+        seen.add(key)
+        rows.append({
+            "device": device,
+            "from_zone": policy["from_zone"] or "global",
+            "to_zone": policy["to_zone"] or "global",
+            "name": policy["name"],
+            "sequence": policy["sequence"],
+            "action": policy["action"],
+            "hits": counts.get(key),
+        })
+    unmatched = [key for key in counts if key not in seen]
+    return rows, unmatched
+
+# Zero-hit policies first; among them permits before denies, since an unused
+# permit is the one worth removing
+def rank_policies(rows):
+    return sorted(
+        (row for row in rows if row["hits"] is not None),
+        key=lambda row: (row["hits"], row["action"] != "permit", row["device"], row["from_zone"],
+                         row["to_zone"], row["sequence"]),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Join SRX policy hit counts to the converted policy table')
+    parser.add_argument('--device', nargs=2, action='append', default=[], metavar=('CONFIG', 'HITS'),
+                        help='Converted JSON config and its hit-count output (repeatable)')
+    parser.add_argument('-o', '--output-file', help='Write the joined table as CSV to this file')
+    parser.add_argument('--top', type=int, default=20, help='Number of zero-hit policies to print')
+    args = parser.parse_args()
+
+    if not args.device:
+        print("Error: give at least one --device CONFIG HITS pair")
+        return
+
+    rows = []
+    for config_file, hits_file in args.device:
+        device = os.path.splitext(os.path.basename(config_file))[0]
+        try:
+            config = load_json_config(config_file)
+            counts = load_hit_counts(hits_file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading {device}: {str(e)}")
+            continue
+        device_rows, unmatched = join_hit_counts(device, config, counts)
+        rows.extend(device_rows)
+        for from_zone, to_zone, name in unmatched:
+            print(f"Warning: {device}: hit count for unknown policy {from_zone or 'global'} -> {to_zone or 'global'} {name}")
+
+    ranked = rank_policies(rows)
+    zero = [row for row in ranked if row["hits"] == 0]
+    for row in zero[:args.top]:
+        print(f"{row['device']}: {row['from_zone']} -> {row['to_zone']} {row['name']} ({row['action']}, sequence {row['sequence']})")
+    missing = sum(1 for row in rows if row["hits"] is None)
+    print(f"{len(zero)} zero-hit policies out of {len(rows)} ({missing} without a hit count)")
+
+    if args.output_file:
+        with open(args.output_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["device", "from_zone", "to_zone", "name", "sequence", "action", "hits"])
+            writer.writeheader()
+            writer.writerows(ranked + [row for row in rows if row["hits"] is None])
+
+if __name__ == "__main__":
+    main()
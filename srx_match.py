@@ -0,0 +1,213 @@
+import csv
+import json
+import argparse
+from bisect import bisect_right
+
+from juniper_srx_set_to_json import load_json_config
+from srx_policies import extract_policies, index_by_zone_pair
+from srx_addresses import (
+    build_address_resolver, resolve_address_name, ip_to_int, merge_intervals, complement_intervals,
+)
+from srx_applications import build_application_resolver, resolve_application_name, service_key
+from srx_routing import build_routing_index, zones_for_flow
+
+# Segment index over one match dimension. Each segment carries a bitmask with
+# bit i set when policy i matches there, so a lookup is a bisect per dimension
+# and the first matching policy is the lowest bit of the AND of the masks.
+# A policy's intervals are merged first, since an interval that closes inside
+# another of the same policy would otherwise clear its bit too early.
+def build_mask_index(interval_lists):
+    opening = {}
+    closing = {}
+    for position, intervals in enumerate(interval_lists):
+        bit = 1 << position
+        for start, end in merge_intervals(intervals):
+            opening[start] = opening.get(start, 0) | bit
+            closing[end + 1] = closing.get(end + 1, 0) | bit
+
+    starts = []
+    masks = []
+    mask = 0
+    for point in sorted(set(opening) | set(closing)):
+        mask = (mask & ~closing.get(point, 0)) | opening.get(point, 0)
+        starts.append(point)
+        masks.append(mask)
+
+    return starts, masks
+
+def mask_at(index, value):
+    starts, masks = index
+    position = bisect_right(starts, value) - 1
+    return masks[position] if position >= 0 else 0
+
+def resolve_names(names, resolve):
+    return [interval for name in names for interval in resolve(name)]
+
+# Merged intervals of a policy's source_address or destination_address,
+# complemented when the match is negated with *-address-excluded. Unresolved
+# names still give no intervals, so such a policy never matches.
+def policy_addresses(policy, field, resolve):
+    intervals = merge_intervals(resolve_names(policy[field], resolve))
+    if intervals and policy.get(f"{field}_excluded"):
+        return complement_intervals(intervals)
+    return intervals
+
+# Compile an ordered list of policies into one mask index per dimension.
+# Global policies only see the global address book, so they pass zone None.
+def compile_policies(policies, addresses, applications, from_zone=None, to_zone=None):
+    return {
+        "policies": policies,
+        "source": build_mask_index([
+            policy_addresses(p, "source_address", lambda n: resolve_address_name(addresses, from_zone, n))
+            for p in policies
+        ]),
+        "destination": build_mask_index([
+            policy_addresses(p, "destination_address", lambda n: resolve_address_name(addresses, to_zone, n))
+            for p in policies
+        ]),
+        "service": build_mask_index([
+            resolve_names(p["application"], lambda n: resolve_application_name(applications, n))
+            for p in policies
+        ]),
+    }
+
+# Masks of global policies usable for a zone, keyed by zone name; "*" holds
+# the policies without a from-zone/to-zone restriction, including those that
+# match zone "any"
+def global_zone_masks(policies, field):
+    masks = {"*": 0}
+    for position, policy in enumerate(policies):
+        zones = policy[field]
+        if "any" in zones:
+            zones = []
+        for zone in zones or ["*"]:
+            masks[zone] = masks.get(zone, 0) | (1 << position)
+    return masks
+
+def compile_policy_engine(config):
+    addresses = build_address_resolver(config)
+    applications = build_application_resolver(config)
+    table = index_by_zone_pair(extract_policies(config))
+    global_policies = table.pop((None, None), [])
+
+    return {
+        "zone_pairs": {
+            (from_zone, to_zone): compile_policies(policies, addresses, applications, from_zone, to_zone)
+            for (from_zone, to_zone), policies in table.items()
+        },
+        "global": compile_policies(global_policies, addresses, applications),
+        "global_from": global_zone_masks(global_policies, "match_from_zone"),
+        "global_to": global_zone_masks(global_policies, "match_to_zone"),
+    }
+
+def first_match(compiled, source, destination, service, mask=-1):
+    mask &= mask_at(compiled["source"], source)
+    if mask:
+        mask &= mask_at(compiled["destination"], destination)
+    if mask:
+        mask &= mask_at(compiled["service"], service)
+    if not mask:
+        return None
+    return compiled["policies"][(mask & -mask).bit_length() - 1]
+
+# Return the first policy matching the flow, like "show security match-policies".
+# Zone-pair policies are evaluated before global policies; None means default deny.
+def match_policy(engine, from_zone, to_zone, source_ip, destination_ip, protocol, port=0):
+    source = ip_to_int(source_ip)
+    destination = ip_to_int(destination_ip)
+    service = service_key(protocol, int(port))
+
+    compiled = engine["zone_pairs"].get((from_zone, to_zone))
+    if compiled:
+        policy = first_match(compiled, source, destination, service)
+        if policy:
+            return policy
+
+    global_from = engine["global_from"]
+    global_to = engine["global_to"]
+    zones = ((global_from["*"] | global_from.get(from_zone, 0)) &
+             (global_to["*"] | global_to.get(to_zone, 0)))
+    if not zones:
+        return None
+    return first_match(engine["global"], source, destination, service, zones)
+
+# Match a flow without zones: both are derived from the route lookups
+def match_flow_by_route(engine, routes, source_ip, destination_ip, protocol, port=0):
+    from_zone, to_zone = zones_for_flow(routes, source_ip, destination_ip)
+    return match_policy(engine, from_zone, to_zone, source_ip, destination_ip, protocol, port)
+
+# Replay a CSV of flows (from_zone,to_zone,source,destination,protocol,port).
+# When routes are given, missing or empty zone columns are derived by route lookup.
+def match_flows_file(engine, flows_file, output_file, routes=None):
+    matched = 0
+    with open(flows_file, 'r', newline='') as f, open(output_file, 'w', newline='') as out:
+        reader = csv.DictReader(f)
+        writer = csv.writer(out)
+        writer.writerow(reader.fieldnames + ["policy", "action"])
+        for row in reader:
+            from_zone, to_zone = row.get("from_zone"), row.get("to_zone")
+            if routes is not None and not (from_zone and to_zone):
+                from_zone, to_zone = zones_for_flow(routes, row["source"], row["destination"])
+            policy = match_policy(
+                engine, from_zone, to_zone, row["source"],
+                row["destination"], row["protocol"], row.get("port") or 0,
+            )
+            values = [row[field] for field in reader.fieldnames]
+            if policy:
+                matched += 1
+                writer.writerow(values + [policy["name"], policy["action"]])
+            else:
+                writer.writerow(values + ["(default)", "deny"])
+    return matched
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline security policy lookup over a converted SRX config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('--flow', nargs=6, metavar=('FROM_ZONE', 'TO_ZONE', 'SOURCE', 'DESTINATION', 'PROTOCOL', 'PORT'),
+                        help='Match a single flow')
+    parser.add_argument('--route-flow', nargs=4, metavar=('SOURCE', 'DESTINATION', 'PROTOCOL', 'PORT'),
+                        help='Match a single flow, deriving both zones from the routing table')
+    parser.add_argument('--route-zones', action='store_true', help='Derive missing zones in --flows-file from the routing table')
+    parser.add_argument('--flows-file', type=str, help='CSV of flows to match (from_zone,to_zone,source,destination,protocol,port)')
+    parser.add_argument('--output-file', default='matches.csv', help='Where to write the results of --flows-file')
+    args = parser.parse_args()
+
+    try:
+        config = load_json_config(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    engine = compile_policy_engine(config)
+    routes = build_routing_index(config) if args.route_flow or args.route_zones else None
+
+    if args.flow:
+        policy = match_policy(engine, *args.flow)
+        if policy:
+            print(f"Matched policy {policy['name']} (sequence {policy['sequence']}): {policy['action']}")
+        else:
+            print("No policy matched: default deny")
+
+    if args.route_flow:
+        source, destination = args.route_flow[:2]
+        from_zone, to_zone = zones_for_flow(routes, source, destination)
+        print(f"Zones from routing table: {from_zone or '-'} -> {to_zone or '-'}")
+        policy = match_flow_by_route(engine, routes, *args.route_flow)
+        if policy:
+            print(f"Matched policy {policy['name']} (sequence {policy['sequence']}): {policy['action']}")
+        else:
+            print("No policy matched: default deny")
+
+    if args.flows_file:
+        try:
+            matched = match_flows_file(engine, args.flows_file, args.output_file, routes)
+        except FileNotFoundError:
+            print(f"Error: File {args.flows_file} not found")
+            return
+        print(f"Successfully matched {matched} flows, results written to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
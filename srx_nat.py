@@ -0,0 +1,303 @@
+import json
+import argparse
+
+from juniper_srx_set_to_json import branch, leaf_values, load_json_config
+from srx_addresses import (
+    build_address_resolver, resolve_address_name, prefix_to_interval, ip_to_int, int_to_ip, merge_intervals,
+)
+from srx_applications import (
+    build_application_resolver, resolve_application_name, protocol_number, port_range, service_interval,
+    service_key, ANY_SERVICE,
+)
+from srx_match import build_mask_index, mask_at
+from srx_routing import build_routing_index, MASTER_INSTANCE
+
+# Rule-set context kinds from the most to the least specific; when several
+# rule-sets match a flow, the most specific context is evaluated first
+CONTEXT_KINDS = ("interface", "zone", "routing-instance")
+
+# Junos applies static NAT, then destination NAT, then source NAT
+NAT_TYPES = ("static", "destination", "source")
+
+def first_value(node, key, default=None):
+    return next(iter(leaf_values(node.get(key))), default)
+
+# Pools hold "address A" or "address A to B" entries plus an optional port.
+# Entries that are not addresses are listed under "unresolved" and leave the
+# pool's addresses None, as for unresolved address-book entries.
+def extract_pools(nat, nat_type):
+    pools = {}
+    for name in branch(nat, nat_type, "pool"):
+        node = branch(nat, nat_type, "pool", name)
+        intervals = []
+        unresolved = []
+        port = first_value(node, "port")
+        for address in branch(node, "address"):
+            high = first_value(branch(node, "address", address), "to")
+            try:
+                low = prefix_to_interval(address)
+                intervals.append((low[0], prefix_to_interval(high)[1]) if high else low)
+            except ValueError:
+                unresolved.append(f"{address} to {high}" if high else address)
+            # Destination pools give the port after the address
+            port = port or first_value(branch(node, "address", address), "port")
+        pools[name] = {
+            "type": nat_type,
+            "name": name,
+            "addresses": None if unresolved else merge_intervals(intervals),
+            "unresolved": unresolved,
+            "port": int(port) if port and port.isdigit() else None,
+        }
+    return pools
+
+def make_nat_rule(nat_type, rule_set, name, node, sequence):
+    match = branch(node, "match")
+    then = branch(node, "then", f"{nat_type}-nat")
+    action = next(iter(then), "")
+    return {
+        "type": nat_type,
+        "rule_set": rule_set["name"],
+        "name": name,
+        "sequence": sequence,
+        "source_address": leaf_values(match.get("source-address")),
+        "source_address_name": leaf_values(match.get("source-address-name")),
+        "destination_address": leaf_values(match.get("destination-address")),
+        "destination_address_name": leaf_values(match.get("destination-address-name")),
+        "destination_port": [
+            f"{low}-{high}" if high else low
+            for low in branch(match, "destination-port")
+            for high in [first_value(branch(match, "destination-port", low), "to")]
+        ],
+        "protocol": leaf_values(match.get("protocol")),
+        "application": leaf_values(match.get("application")),
+        "action": action,
+        "pool": first_value(then, "pool") if action == "pool" else None,
+        "prefix": first_value(then, "prefix") if action == "prefix" else None,
+    }
+
+# Extract ordered rule-sets (with their from/to context) and pools of every NAT type
+def extract_nat(config):
+    nat = branch(config, "security", "nat")
+    rule_sets = []
+    pools = {}
+
+    for nat_type in NAT_TYPES:
+        pools.update({(nat_type, name): pool for name, pool in extract_pools(nat, nat_type).items()})
+        for rule_set_name in branch(nat, nat_type, "rule-set"):
+            node = branch(nat, nat_type, "rule-set", rule_set_name)
+            rule_set = {
+                "type": nat_type,
+                "name": rule_set_name,
+                "from": {kind: leaf_values(values) for kind, values in branch(node, "from").items()},
+                "to": {kind: leaf_values(values) for kind, values in branch(node, "to").items()},
+            }
+            rules = branch(node, "rule")
+            rule_set["rules"] = [
+                make_nat_rule(nat_type, rule_set, name, branch(rules, name), sequence)
+                for sequence, name in enumerate(rules, 1)
+            ]
+            rule_sets.append(rule_set)
+
+    return rule_sets, pools
+
+def rule_service_intervals(rule, applications):
+    if rule["application"]:
+        return [i for name in rule["application"] for i in resolve_application_name(applications, name)]
+    protocols = [protocol_number(p) for p in rule["protocol"]]
+    ports = [port_range(p) for p in rule["destination_port"]]
+    if not protocols and not ports:
+        return ANY_SERVICE
+    if not protocols:
+        protocols = range(256)
+    return [service_interval(protocol, *port) for protocol in protocols for port in (ports or [(0, 65535)])]
+
+def rule_address_intervals(prefixes, names, addresses):
+    if not prefixes and not names:
+        return resolve_address_name(addresses, None, "any")
+    intervals = [prefix_to_interval(prefix) for prefix in prefixes]
+    intervals.extend(i for name in names for i in resolve_address_name(addresses, None, name))
+    return merge_intervals(intervals)
+
+# Compile each rule-set into the same per-dimension mask indexes as the policy engine
+def compile_nat_engine(config):
+    addresses = build_address_resolver(config)
+    applications = build_application_resolver(config)
+    rule_sets, pools = extract_nat(config)
+
+    for rule_set in rule_sets:
+        rules = rule_set["rules"]
+        rule_set["source"] = build_mask_index([
+            rule_address_intervals(r["source_address"], r["source_address_name"], addresses) for r in rules
+        ])
+        rule_set["destination"] = build_mask_index([
+            rule_address_intervals(r["destination_address"], r["destination_address_name"], addresses) for r in rules
+        ])
+        rule_set["service"] = build_mask_index([rule_service_intervals(r, applications) for r in rules])
+
+    interfaces = build_routing_index(config)["interfaces"]
+    zone_instances = {}
+    for details in interfaces.values():
+        if details["zone"]:
+            zone_instances.setdefault(details["zone"], set()).add(details["instance"])
+    return {"rule_sets": rule_sets, "pools": pools, "interfaces": interfaces, "zone_instances": zone_instances}
+
+# Describe one side of a flow by interface, zone and routing-instance. The
+# interface index fills in the zone and instance of a known unit; a zone whose
+# units all sit in one routing-instance gives that instance.
+def flow_context(engine, zone=None, interface=None):
+    details = engine["interfaces"].get(interface, {}) if interface else {}
+    zone = zone or details.get("zone")
+    instance = details.get("instance")
+    if instance is None and zone:
+        instances = engine["zone_instances"].get(zone, set())
+        instance = next(iter(instances)) if len(instances) == 1 else None
+    # NAT contexts call the master instance "default"
+    if instance == MASTER_INSTANCE:
+        instance = "default"
+    return {"interface": interface, "zone": zone, "routing-instance": instance}
+
+# Return the specificity rank of a rule-set context that matches the flow,
+# None when it does not match, or "unsupported" when the flow does not carry
+# the field the context is written against
+def context_rank(context, flow):
+    if not context:
+        return len(CONTEXT_KINDS)
+    if any(kind not in CONTEXT_KINDS for kind in context):
+        return "unsupported"
+    rank, kind = next((rank, kind) for rank, kind in enumerate(CONTEXT_KINDS) if kind in context)
+    if flow.get(kind) is None:
+        return "unsupported"
+    return rank if flow[kind] in context[kind] else None
+
+# Walk the rule-sets of one NAT type whose context matches, most specific
+# first (config order among equals), and return the first matching rule and
+# the rule-sets that were skipped because their context could not be resolved
+def first_nat_rule(engine, nat_type, from_flow, to_flow, source, destination, service):
+    candidates = []
+    unsupported = []
+    for position, rule_set in enumerate(engine["rule_sets"]):
+        if rule_set["type"] != nat_type:
+            continue
+        ranks = [context_rank(rule_set["from"], from_flow)]
+        if nat_type == "source":
+            ranks.append(context_rank(rule_set["to"], to_flow))
+        if None in ranks:
+            continue
+        if "unsupported" in ranks:
+            unsupported.append(rule_set["name"])
+            continue
+        candidates.append((ranks, position, rule_set))
+
+    for _, _, rule_set in sorted(candidates, key=lambda candidate: candidate[:2]):
+        mask = mask_at(rule_set["source"], source) & mask_at(rule_set["destination"], destination)
+        mask &= mask_at(rule_set["service"], service)
+        if mask:
+            return rule_set["rules"][(mask & -mask).bit_length() - 1], unsupported
+    return None, unsupported
+
+# Static NAT maps the matched destination prefix one-to-one onto the target prefix
+def static_translation(rule, destination):
+    low, _ = prefix_to_interval(rule["destination_address"][0]) if rule["destination_address"] else (destination, destination)
+    target, _ = prefix_to_interval(rule["prefix"])
+    return target + (destination - low)
+
+# Return the matching rule of each NAT type and the translated tuple. Pool
+# translations report the first pool address; the device allocates from the pool.
+# Ingress and egress units, when given, resolve interface and routing-instance
+# contexts. Rule-sets whose context cannot be resolved from what was given are
+# listed per NAT type under "unsupported" instead of being treated as misses.
+def lookup_nat(engine, from_zone, to_zone, source_ip, destination_ip, protocol, port=0,
+               from_interface=None, to_interface=None):
+    source = ip_to_int(source_ip)
+    destination = ip_to_int(destination_ip)
+    port = int(port)
+    service = service_key(protocol, port)
+    from_flow = flow_context(engine, from_zone, from_interface)
+    to_flow = flow_context(engine, to_zone, to_interface)
+    result = {"static": None, "destination": None, "source": None, "unsupported": {}}
+
+    def first_rule(nat_type):
+        rule, unsupported = first_nat_rule(engine, nat_type, from_flow, to_flow, source, destination, service)
+        if unsupported:
+            result["unsupported"][nat_type] = unsupported
+        return rule
+
+    rule = first_rule("static")
+    if rule:
+        result["static"] = rule
+        if rule["prefix"]:
+            destination = static_translation(rule, destination)
+    else:
+        rule = first_rule("destination")
+        if rule:
+            result["destination"] = rule
+            pool = engine["pools"].get(("destination", rule["pool"]))
+            if pool and pool["addresses"]:
+                destination = pool["addresses"][0][0]
+                port = pool["port"] or port
+
+    rule = first_rule("source")
+    translated_source = int_to_ip(source)
+    if rule:
+        result["source"] = rule
+        pool = engine["pools"].get(("source", rule["pool"]))
+        if rule["action"] == "interface":
+            translated_source = "interface"
+        elif pool and pool["addresses"]:
+            translated_source = int_to_ip(pool["addresses"][0][0])
+
+    result["translated"] = {"source": translated_source, "destination": int_to_ip(destination), "port": port}
+    return result
+
+def strip_compiled(rule_set):
+    return {key: value for key, value in rule_set.items() if key not in ("source", "destination", "service")}
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract and query NAT rule-sets of a converted SRX config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', type=str, help='Write the NAT rule-set and pool tables to this file')
+    parser.add_argument('--flow', nargs=6, metavar=('FROM_ZONE', 'TO_ZONE', 'SOURCE', 'DESTINATION', 'PROTOCOL', 'PORT'),
+                        help='Show the NAT rules matching a single flow')
+    parser.add_argument('--from-interface', help='Ingress unit of the --flow, e.g. ge-0/0/1.0')
+    parser.add_argument('--to-interface', help='Egress unit of the --flow')
+    args = parser.parse_args()
+
+    try:
+        engine = compile_nat_engine(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    for pool in engine["pools"].values():
+        if pool["unresolved"]:
+            print(f"Warning: {pool['type']} NAT pool {pool['name']} has unresolved addresses: "
+                  f"{', '.join(pool['unresolved'])}")
+
+    if args.output_file:
+        output = {
+            "rule_sets": [strip_compiled(rule_set) for rule_set in engine["rule_sets"]],
+            "pools": [
+                dict(pool, addresses=[f"{int_to_ip(s)}-{int_to_ip(e)}" for s, e in pool["addresses"] or []])
+                for pool in engine["pools"].values()
+            ],
+        }
+        with open(args.output_file, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Successfully extracted {len(output['rule_sets'])} NAT rule-sets to {args.output_file}")
+
+    if args.flow:
+        result = lookup_nat(engine, *args.flow, from_interface=args.from_interface, to_interface=args.to_interface)
+        for nat_type in NAT_TYPES:
+            rule = result[nat_type]
+            if rule:
+                print(f"{nat_type} NAT: rule-set {rule['rule_set']} rule {rule['name']} ({rule['action']})")
+            for name in result["unsupported"].get(nat_type, []):
+                print(f"Warning: {nat_type} NAT rule-set {name} has a context the flow does not resolve")
+        translated = result["translated"]
+        print(f"Translated: {translated['source']} -> {translated['destination']} port {translated['port']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import json
+import argparse
+
+from juniper_srx_set_to_json import branch, leaf_values, load_json_config
+
+POLICY_ACTIONS = ("permit", "deny", "reject")
+
+# Normalize one policy node into a flat record
+def make_policy_record(from_zone, to_zone, name, node, sequence):
+    match = branch(node, "match")
+    then = branch(node, "then")
+    log = leaf_values(then.get("log"))
+    action = next((a for a in POLICY_ACTIONS if a in then), "")
+
+    return {
+        "from_zone": from_zone,
+        "to_zone": to_zone,
+        "name": name,
+        "sequence": sequence,
+        "global": from_zone is None,
+        "match_from_zone": leaf_values(match.get("from-zone")),
+        "match_to_zone": leaf_values(match.get("to-zone")),
+        "source_address": leaf_values(match.get("source-address")),
+        "destination_address": leaf_values(match.get("destination-address")),
+        # source-address-excluded/destination-address-excluded negate the match
+        "source_address_excluded": "source-address-excluded" in match,
+        "destination_address_excluded": "destination-address-excluded" in match,
+        "application": leaf_values(match.get("application")),
+        "action": action,
+        "log_init": "session-init" in log,
+        "log_close": "session-close" in log,
+        "count": "count" in then,
+        "scheduler": next(iter(leaf_values(node.get("scheduler-name"))), None),
+        "description": next(iter(leaf_values(node.get("description"))), ""),
+    }
+
+# Extract every zone-pair policy followed by the global policies, in sequence order
+def extract_policies(config):
+    policies = branch(config, "security", "policies")
+    records = []
+
+    for from_zone, from_node in branch(policies, "from-zone").items():
+        for to_zone in branch(from_node, "to-zone"):
+            zone_policies = branch(from_node, "to-zone", to_zone, "policy")
+            for sequence, name in enumerate(zone_policies, 1):
+                records.append(make_policy_record(from_zone, to_zone, name, branch(zone_policies, name), sequence))
+
+    global_policies = branch(policies, "global", "policy")
+    for sequence, name in enumerate(global_policies, 1):
+        records.append(make_policy_record(None, None, name, branch(global_policies, name), sequence))
+
+    return records
+
+# Group records by (from_zone, to_zone); global policies are keyed (None, None)
+def index_by_zone_pair(records):
+    table = {}
+    for record in records:
+        table.setdefault((record["from_zone"], record["to_zone"]), []).append(record)
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract a flat security policy table from a converted SRX config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', default='policies.json', help='Path to write the policy table to')
+    args = parser.parse_args()
+
+    try:
+        config = load_json_config(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    records = extract_policies(config)
+    with open(args.output_file, 'w') as f:
+        json.dump(records, f, indent=2)
+
+    zone_pairs = index_by_zone_pair(records)
+    print(f"Successfully extracted {len(records)} policies across {len(zone_pairs)} zone pairs to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
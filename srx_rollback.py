@@ -0,0 +1,231 @@
+import os
+import re
+import copy
+import glob
+import json
+import argparse
+from bisect import bisect_left, insort
+
+from juniper_srx_set_to_json import (
+    tokenize, apply_line, set_leaf, remove_from_dict, format_statement,
+)
+
+# The stripped "set" lines of a rollback file, in file order. Lines are kept
+# as text so consecutive rollbacks can be compared without tokenizing them.
+def read_set_lines(path):
+    with open(path, 'r') as f:
+        return [line for line in map(str.strip, f) if line.startswith("set ")]
+
+# Tokenize the lines not seen in an earlier file, recording for each token
+# path the line texts that spell it (quoting and spacing may differ)
+def tokenize_new_lines(lines, tokens_of, texts_of):
+    for line in lines:
+        if line not in tokens_of:
+            tokens = tokens_of[line] = tuple(tokenize(line[4:]))
+            texts_of.setdefault(tokens, set()).add(line)
+
+# rollback_0.set, rollback.12, juniper.conf.3.set ... ordered newest (0) first
+def find_rollback_files(source):
+    pattern = os.path.join(source, "*") if os.path.isdir(source) else source
+    numbered = []
+    for path in glob.glob(pattern):
+        numbers = re.findall(r'\d+', os.path.basename(path))
+        if numbers and os.path.isfile(path):
+            numbered.append((int(numbers[-1]), path))
+    return [path for _, path in sorted(numbered)]
+
+def set_statement(config, tokens):
+    if len(tokens) == 1:
+        config.setdefault(tokens[0], {})
+    else:
+        set_leaf(config, list(tokens[:-1]), tokens[-1])
+
+# The file position of each line; the first occurrence counts, since
+# repeating a statement does not change the tree. Keyed by text, whose hash
+# Python caches, rather than by token tuples.
+def line_positions(lines):
+    return dict(zip(reversed(lines), range(len(lines) - 1, -1, -1)))
+
+# Sort key giving a statement's first position in the file
+def position_key(positions, texts_of):
+    def position(tokens):
+        return min(positions[line] for line in texts_of[tokens] if line in positions)
+    return position
+
+# An index is (distinct statements sorted by their tokens, position key): the
+# statements under any prefix form one contiguous range of the sorted list
+def prefix_range(index, prefix):
+    keys = index[0]
+    low = bisect_left(keys, prefix)
+    return low, bisect_left(keys, prefix[:-1] + (prefix[-1] + "\0",), low)
+
+# The statements under prefix in file order
+def statements_under(index, prefix):
+    keys, position = index
+    low, high = prefix_range(index, prefix)
+    return sorted(keys[low:high], key=position)
+
+# Whether set_to_json makes the node at prefix a branch: it does when anything
+# is configured below one of its values, or when the node is set on its own
+# before any value is given to it
+def is_branch(index, prefix):
+    keys = index[0]
+    depth = len(prefix)
+    low, high = prefix_range(index, prefix)
+    if any(len(keys[i]) > depth + 1 for i in range(low, high)):
+        return True
+    for tokens in statements_under(index, prefix):
+        return len(tokens) == depth
+    return False
+
+# Bring the subtree at prefix in line with the new statements. The node under
+# a branch depends only on the statements under its prefix, in file order, so
+# a branch that stays a branch is descended into and anything else (leaves,
+# lists, a branch turning into a leaf) is deleted and set again in file order.
+# Prefixes reached only through moved statements are skipped when their
+# statements kept their order.
+def sync_prefix(config, prefix, old_index, new_index, children, differs, operations):
+    if prefix not in differs and statements_under(old_index, prefix) == statements_under(new_index, prefix):
+        return
+    parent = config
+    for key in prefix[:-1]:
+        parent = parent[key]
+    node = parent.get(prefix[-1])
+
+    low, high = prefix_range(new_index, prefix)
+    if low < high and isinstance(node, dict) and is_branch(new_index, prefix):
+        for child in sorted(children.get(prefix, ())):
+            sync_prefix(config, child, old_index, new_index, children, differs, operations)
+        return
+    if node is not None:
+        remove_from_dict(config, list(prefix))
+        operations.append(("delete", prefix))
+    for tokens in statements_under(new_index, prefix):
+        set_statement(config, tokens)
+        operations.append(("set", tokens))
+
+def all_prefixes(statements):
+    return {tokens[:depth] for tokens in statements for depth in range(1, len(tokens) + 1)}
+
+# Lines kept by both files whose order relative to each other may have
+# changed; moving a statement can change the order of a leaf list without
+# adding anything. Outside the window between the common head and tail of the
+# kept lines nothing moved, so the window is all that needs resyncing.
+def moved_lines(previous, lines, removed, added):
+    kept_before = [line for line in previous if line not in removed]
+    kept_after = [line for line in lines if line not in added]
+    if kept_before == kept_after:
+        return set()
+    shorter = min(len(kept_before), len(kept_after))
+    head = next((i for i in range(shorter) if kept_before[i] != kept_after[i]), shorter)
+    tail = next((i for i in range(shorter - head) if kept_before[-1 - i] != kept_after[-1 - i]), shorter - head)
+    return set(kept_before[head:len(kept_before) - tail]) | set(kept_after[head:len(kept_after) - tail])
+
+# Convert rollback 0 fully, then turn each older rollback into the set/delete
+# lines that transform the previous version into it. Consecutive rollbacks
+# are compared as raw lines, so only added lines are tokenized, and the sorted
+# statement index is patched instead of rebuilt. Only the subtrees below
+# changed statements are touched, and replaying a delta gives exactly the
+# tree set_to_json makes from that rollback file.
+def convert_rollbacks(files):
+    tokens_of = {}
+    texts_of = {}
+    previous = read_set_lines(files[0])
+    tokenize_new_lines(previous, tokens_of, texts_of)
+    config = {}
+    for line in previous:
+        set_statement(config, tokens_of[line])
+    # A JSON round trip copies the plain tree much faster than deepcopy
+    history = {"base": {"rollback": 0, "file": files[0], "config": json.loads(json.dumps(config))}, "deltas": []}
+
+    previous_set = set(previous)
+    old_index = (sorted(texts_of), position_key(line_positions(previous), texts_of))
+    for rollback, path in enumerate(files[1:], 1):
+        lines = read_set_lines(path)
+        line_set = set(lines)
+        added_lines = line_set - previous_set
+        removed_lines = previous_set - line_set
+        tokenize_new_lines(added_lines, tokens_of, texts_of)
+        positions = line_positions(lines)
+
+        # A statement is only added or removed when no spelling of it is left;
+        # lines rewritten without changing their tokens may still have moved
+        changed = {tokens_of[line] for line in added_lines | removed_lines}
+        added = {tokens for tokens in changed if texts_of[tokens].isdisjoint(previous_set)}
+        removed = {tokens for tokens in changed if texts_of[tokens].isdisjoint(line_set)}
+        rewritten = changed - added - removed
+        keys = old_index[0]
+        if added or removed:
+            keys = list(keys)
+            for tokens in removed:
+                del keys[bisect_left(keys, tokens)]
+            for tokens in added:
+                insort(keys, tokens)
+        new_index = (keys, position_key(positions, texts_of))
+
+        differs = all_prefixes(added | removed)
+        moved = {tokens_of[line] for line in moved_lines(previous, lines, removed_lines, added_lines)}
+        prefixes = differs | all_prefixes(moved | rewritten)
+        children = {}
+        for prefix in prefixes:
+            if len(prefix) > 1:
+                children.setdefault(prefix[:-1], set()).add(prefix)
+
+        operations = []
+        for prefix in sorted(p for p in prefixes if len(p) == 1):
+            sync_prefix(config, prefix, old_index, new_index, children, differs, operations)
+        history["deltas"].append({
+            "rollback": rollback,
+            "file": path,
+            "lines": [f"{verb} {format_statement(tokens)}" for verb, tokens in operations],
+        })
+        previous, previous_set, old_index = lines, line_set, new_index
+
+    return history
+
+# Rebuild rollback N from a history by replaying its deltas on the base tree
+def history_config(history, rollback):
+    config = copy.deepcopy(history["base"]["config"])
+    for delta in history["deltas"]:
+        if delta["rollback"] > rollback:
+            break
+        for line in delta["lines"]:
+            apply_line(config, line)
+    return config
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert SRX rollback archives into a delta-encoded history')
+    parser.add_argument('source', nargs='?', help='Directory or glob of rollback set files (rollback 0 = newest)')
+    parser.add_argument('-o', '--output-file', default='history.json', help='Path to write the history (or rebuilt config) to')
+    parser.add_argument('--history', type=str, help='Existing history file to rebuild a rollback from')
+    parser.add_argument('--rollback', type=int, help='With --history, rebuild this rollback number')
+    args = parser.parse_args()
+
+    if args.history:
+        try:
+            with open(args.history, 'r') as f:
+                history = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: File {args.history} not found")
+            return
+        config = history_config(history, args.rollback or 0)
+        with open(args.output_file, 'w') as f:
+            json.dump(config, f, indent=4)
+        print(f"Successfully rebuilt rollback {args.rollback or 0} to {args.output_file}")
+        return
+
+    if not args.source:
+        parser.error("a source of rollback files or --history is required")
+    files = find_rollback_files(args.source)
+    if not files:
+        print(f"Error: no rollback files found in {args.source}")
+        return
+
+    history = convert_rollbacks(files)
+    with open(args.output_file, 'w') as f:
+        json.dump(history, f, indent=2)
+    changed = sum(len(delta["lines"]) for delta in history["deltas"])
+    print(f"Successfully converted {len(files)} rollbacks ({changed} delta lines) to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
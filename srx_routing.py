@@ -0,0 +1,190 @@
+import json
+import argparse
+import ipaddress
+
+from juniper_srx_set_to_json import branch, leaf_values, load_json_config
+from srx_addresses import V4_BASE, ip_to_int
+
+MASTER_INSTANCE = "master"
+
+# Routes live in a binary trie over the shared 128-bit address space (IPv4
+# is IPv4-mapped, so an IPv4 prefix length is offset by 96). A node is a list
+# [zero child, one child, route].
+def prefix_key(prefix):
+    network = ipaddress.ip_network(prefix, strict=False)
+    if network.version == 4:
+        return V4_BASE + int(network.network_address), 96 + network.prefixlen
+    return int(network.network_address), network.prefixlen
+
+def trie_insert(root, prefix, route):
+    start, length = prefix_key(prefix)
+    node = root
+    for bit in range(length):
+        branch_bit = (start >> (127 - bit)) & 1
+        if node[branch_bit] is None:
+            node[branch_bit] = [None, None, None]
+        node = node[branch_bit]
+    # Keep the first route per prefix; direct routes are inserted before static ones
+    if node[2] is None:
+        node[2] = route
+
+def trie_lookup(root, address):
+    node, best = root, root[2]
+    for bit in range(128):
+        node = node[(address >> (127 - bit)) & 1]
+        if node is None:
+            break
+        if node[2] is not None:
+            best = node[2]
+    return best
+
+# Map a routing table name to its instance: "VR.inet.0" and "VR.inet6.0"
+# belong to VR, the bare "inet.0"/"inet6.0" tables to the master instance
+def table_instance(table):
+    for suffix in (".inet.0", ".inet6.0"):
+        if table.endswith(suffix):
+            return table[:-len(suffix)]
+    if table in ("inet.0", "inet6.0"):
+        return MASTER_INSTANCE
+    return table
+
+def static_routes(routing_options, instance):
+    routes = []
+    static = branch(routing_options, "static", "route")
+    for prefix in static:
+        node = branch(static, prefix)
+        next_table = next(iter(leaf_values(node.get("next-table"))), None)
+        action = next((a for a in ("discard", "reject") if a in node), None)
+        routes.append({
+            "instance": instance,
+            "prefix": prefix,
+            "type": "static",
+            "next_hop": leaf_values(node.get("next-hop")) + list(branch(node, "qualified-next-hop")),
+            "action": action or ("next-table" if next_table else "forward"),
+            "next_table": table_instance(next_table) if next_table else None,
+        })
+    return routes
+
+# Static routes of an instance's routing-options, including those under
+# "rib <table> static" (e.g. "rib inet6.0" in the master instance or
+# "rib VR.inet6.0" inside routing-instance VR), each tagged with the instance
+# that owns its table
+def instance_static_routes(routing_options, instance):
+    routes = static_routes(routing_options, instance)
+    for table in branch(routing_options, "rib"):
+        table_owner = table_instance(table)
+        if instance != MASTER_INSTANCE and table_owner == MASTER_INSTANCE:
+            # A bare table name inside a routing-instance still belongs to it
+            table_owner = instance
+        routes.extend(static_routes(branch(routing_options, "rib", table), table_owner))
+    return routes
+
+# Index units, zones and routing-instances, and build one route trie per instance
+def build_routing_index(config):
+    interfaces = {}
+    for name in branch(config, "interfaces"):
+        for unit in branch(config, "interfaces", name, "unit"):
+            family = branch(config, "interfaces", name, "unit", unit, "family")
+            interfaces[f"{name}.{unit}"] = {
+                "zone": None,
+                "instance": MASTER_INSTANCE,
+                "addresses": list(branch(family, "inet", "address")) + list(branch(family, "inet6", "address")),
+            }
+
+    zones = {}
+    for zone in branch(config, "security", "zones", "security-zone"):
+        units = list(branch(config, "security", "zones", "security-zone", zone, "interfaces"))
+        zones[zone] = units
+        for unit in units:
+            interfaces.setdefault(unit, {"zone": None, "instance": MASTER_INSTANCE, "addresses": []})["zone"] = zone
+
+    instances = {MASTER_INSTANCE: branch(config, "routing-options")}
+    for instance in branch(config, "routing-instances"):
+        node = branch(config, "routing-instances", instance)
+        instances[instance] = branch(node, "routing-options")
+        for unit in leaf_values(node.get("interface")):
+            interfaces.setdefault(unit, {"zone": None, "instance": MASTER_INSTANCE, "addresses": []})["instance"] = instance
+
+    routes = {instance: [] for instance in instances}
+    for unit, details in interfaces.items():
+        for address in details["addresses"]:
+            network = ipaddress.ip_interface(address).network
+            routes[details["instance"]].append({
+                "instance": details["instance"], "prefix": str(network), "type": "direct",
+                "interface": unit, "next_hop": [], "action": "forward", "next_table": None,
+            })
+    for instance, routing_options in instances.items():
+        for route in instance_static_routes(routing_options, instance):
+            routes.setdefault(route["instance"], []).append(route)
+
+    tries = {}
+    for instance, instance_routes in routes.items():
+        root = tries[instance] = [None, None, None]
+        for route in instance_routes:
+            trie_insert(root, route["prefix"], route)
+
+    return {"interfaces": interfaces, "zones": zones, "routes": routes, "tries": tries}
+
+# Longest-prefix match, following next-hops and next-table to the egress unit
+def lookup_route(index, address, instance=MASTER_INSTANCE, depth=0):
+    if isinstance(address, str):
+        address = ip_to_int(address)
+    root = index["tries"].get(instance)
+    route = trie_lookup(root, address) if root else None
+    if route is None or depth > 8:
+        return None, None
+    if route["type"] == "direct" or route["action"] in ("discard", "reject"):
+        return route, route.get("interface")
+    if route["action"] == "next-table":
+        return lookup_route(index, address, route["next_table"], depth + 1)
+    for next_hop in route["next_hop"]:
+        if next_hop in index["interfaces"]:
+            return route, next_hop
+        try:
+            _, unit = lookup_route(index, ip_to_int(next_hop), instance, depth + 1)
+        except ValueError:
+            continue
+        if unit:
+            return route, unit
+    return route, None
+
+def zone_for_address(index, address, instance=MASTER_INSTANCE):
+    _, unit = lookup_route(index, address, instance)
+    return index["interfaces"].get(unit, {}).get("zone") if unit else None
+
+# from-zone is where the source is routed, to-zone where the destination egresses
+def zones_for_flow(index, source_ip, destination_ip, instance=MASTER_INSTANCE):
+    return zone_for_address(index, source_ip, instance), zone_for_address(index, destination_ip, instance)
+
+def main():
+    parser = argparse.ArgumentParser(description='Interface, zone and route lookups over a converted SRX config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('--ip', action='append', default=[], help='Show the route, egress interface and zone for this IP (repeatable)')
+    parser.add_argument('--instance', default=MASTER_INSTANCE, help='Routing instance to look up in')
+    parser.add_argument('-o', '--output-file', type=str, help='Write the interface and route tables to this file')
+    args = parser.parse_args()
+
+    try:
+        index = build_routing_index(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    for ip in args.ip:
+        route, unit = lookup_route(index, ip, args.instance)
+        if route is None:
+            print(f"{ip}: no route")
+            continue
+        zone = index["interfaces"].get(unit, {}).get("zone") if unit else None
+        print(f"{ip}: {route['prefix']} ({route['type']}, {route['action']}) via {unit or '-'} zone {zone or '-'}")
+
+    if args.output_file:
+        with open(args.output_file, 'w') as f:
+            json.dump({"interfaces": index["interfaces"], "zones": index["zones"], "routes": index["routes"]}, f, indent=2)
+        print(f"Successfully wrote interface and route tables to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+
+from juniper_srx_set_to_json import set_to_json
+
+# Keyword grammar for the hierarchies we validate. <name> accepts any token
+# and "..." accepts anything that follows. Lines whose first token is not a
+# root of this grammar (system, interfaces, ...) are not checked.
+DEFAULT_GRAMMAR = """
+security policies from-zone <name> to-zone <name> policy <name> description <name>
+security policies from-zone <name> to-zone <name> policy <name> match source-address <name>
+security policies from-zone <name> to-zone <name> policy <name> match destination-address <name>
+security policies from-zone <name> to-zone <name> policy <name> match source-address-excluded
+security policies from-zone <name> to-zone <name> policy <name> match destination-address-excluded
+security policies from-zone <name> to-zone <name> policy <name> match application <name>
+security policies from-zone <name> to-zone <name> policy <name> match source-identity <name>
+security policies from-zone <name> to-zone <name> policy <name> match dynamic-application <name>
+security policies from-zone <name> to-zone <name> policy <name> match url-category <name>
+security policies from-zone <name> to-zone <name> policy <name> then permit ...
+security policies from-zone <name> to-zone <name> policy <name> then deny
+security policies from-zone <name> to-zone <name> policy <name> then reject ...
+security policies from-zone <name> to-zone <name> policy <name> then log session-init
+security policies from-zone <name> to-zone <name> policy <name> then log session-close
+security policies from-zone <name> to-zone <name> policy <name> then count ...
+security policies from-zone <name> to-zone <name> policy <name> scheduler-name <name>
+security policies global policy <name> description <name>
+security policies global policy <name> match source-address <name>
+security policies global policy <name> match destination-address <name>
+security policies global policy <name> match source-address-excluded
+security policies global policy <name> match destination-address-excluded
+security policies global policy <name> match application <name>
+security policies global policy <name> match from-zone <name>
+security policies global policy <name> match to-zone <name>
+security policies global policy <name> match source-identity <name>
+security policies global policy <name> match dynamic-application <name>
+security policies global policy <name> match url-category <name>
+security policies global policy <name> then permit ...
+security policies global policy <name> then deny
+security policies global policy <name> then reject ...
+security policies global policy <name> then log session-init
+security policies global policy <name> then log session-close
+security policies global policy <name> then count ...
+security policies global policy <name> scheduler-name <name>
+security policies default-policy permit-all
+security policies default-policy deny-all
+security policies policy-rematch ...
+security policies pre-id-default-policy ...
+security policies traceoptions ...
+security policies policy-stats ...
+security policies stateful-firewall-rule ...
+security address-book <name> description <name>
+security address-book <name> address <name> <name>
+security address-book <name> address <name> description <name>
+security address-book <name> address <name> range-address <name> to <name>
+security address-book <name> address <name> dns-name <name> ...
+security address-book <name> address <name> wildcard-address <name>
+security address-book <name> address-set <name> address <name>
+security address-book <name> address-set <name> address-set <name>
+security address-book <name> address-set <name> description <name>
+security address-book <name> attach zone <name>
+security zones security-zone <name> description <name>
+security zones security-zone <name> interfaces <name> ...
+security zones security-zone <name> host-inbound-traffic ...
+security zones security-zone <name> address-book ...
+security zones security-zone <name> screen <name>
+security zones security-zone <name> tcp-rst
+security zones security-zone <name> application-tracking
+security zones functional-zone ...
+security nat source ...
+security nat destination ...
+security nat static ...
+security nat proxy-arp ...
+security nat proxy-ndp ...
+security advance-policy-based-routing ...
+security advanced-connection-tracking ...
+security alarms ...
+security alg ...
+security analytics ...
+security application-firewall ...
+security application-tracking ...
+security authentication-key-chains ...
+security certificates ...
+security cloud ...
+security datapath-debug ...
+security distribution-profile ...
+security dynamic-address ...
+security dynamic-application ...
+security flow ...
+security forwarding-options ...
+security forwarding-process ...
+security gprs ...
+security group-vpn ...
+security gtp ...
+security idp ...
+security ike ...
+security ipsec ...
+security ipsec-policy ...
+security l3vpn ...
+security log ...
+security macsec ...
+security ngfw ...
+security pki ...
+security remote-access ...
+security resource-manager ...
+security screen ...
+security sctp ...
+security ssh-known-hosts ...
+security tcp-encap ...
+security traceoptions ...
+security tunnel-inspection ...
+security user-identification ...
+security utm ...
+applications application <name> description <name>
+applications application <name> protocol <name>
+applications application <name> source-port <name>
+applications application <name> destination-port <name>
+applications application <name> inactivity-timeout <name>
+applications application <name> application-protocol <name>
+applications application <name> icmp-type <name>
+applications application <name> icmp-code <name>
+applications application <name> icmp6-type <name>
+applications application <name> icmp6-code <name>
+applications application <name> rpc-program-number <name>
+applications application <name> uuid <name>
+applications application <name> ether-type <name>
+applications application <name> term <name> ...
+applications application-set <name> description <name>
+applications application-set <name> application <name>
+applications application-set <name> application-set <name>
+"""
+
+# A compiled node is [keyword children, wildcard child, accepts anything after]
+def new_node():
+    return [{}, None, False]
+
+def compile_schema(grammar=DEFAULT_GRAMMAR):
+    root = new_node()
+    for line in grammar.splitlines():
+        node = root
+        for token in line.split():
+            if token == "...":
+                node[2] = True
+                break
+            if token == "<name>":
+                if node[1] is None:
+                    node[1] = new_node()
+                node = node[1]
+            else:
+                node = node[0].setdefault(token, new_node())
+    return root
+
+# Walk the tokens through the compiled trie. Returns the position of the first
+# token the grammar does not allow, or None when the statement is valid or
+# outside the validated hierarchies.
+def validate_statement(schema, tokens):
+    if not tokens or tokens[0] not in schema[0]:
+        return None
+    node = schema
+    for position, token in enumerate(tokens):
+        if node[2]:
+            return None
+        child = node[0].get(token)
+        if child is None:
+            child = node[1]
+            if child is None:
+                return position
+        node = child
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert an SRX set file while validating it against the keyword grammar')
+    parser.add_argument('input_file', help='SRX set file')
+    parser.add_argument('-o', '--output-file', default='output.json', help='Path to write the converted JSON to')
+    args = parser.parse_args()
+
+    try:
+        invalid = set_to_json(args.input_file, args.output_file, schema=compile_schema())
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+
+    for entry in invalid:
+        print(f"Line {entry['line']}: unexpected '{entry['token']}' in: {entry['text']}")
+    print(f"Converted {args.input_file} to {args.output_file} with {len(invalid)} invalid lines")
+
+if __name__ == "__main__":
+    main()
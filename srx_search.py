@@ -0,0 +1,205 @@
+import os
+import glob
+import json
+import sqlite3
+import argparse
+
+from juniper_srx_set_to_json import iter_statements, load_json_config
+from srx_addresses import build_address_resolver, prefix_to_interval, ip_to_int, int_to_ip
+from srx_fleet import MANIFEST_NAME, file_sha256, source_root
+
+# Postings are keyed by token so a lookup is a single index range. IP
+# intervals are stored as fixed-width hex (128-bit values do not fit SQLite
+# integers) together with the bit length of their size, so a containment
+# query only scans [ip - 2**span, ip] within each span class.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (id INTEGER PRIMARY KEY, name TEXT UNIQUE, path TEXT, sha256 TEXT);
+CREATE TABLE IF NOT EXISTS statements (
+    device_id INTEGER, id INTEGER, text TEXT, PRIMARY KEY (device_id, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT, device_id INTEGER, statement_id INTEGER, PRIMARY KEY (token, device_id, statement_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_device ON postings (device_id);
+CREATE TABLE IF NOT EXISTS intervals (
+    device_id INTEGER, span INTEGER, start TEXT, end TEXT, object TEXT, statement_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS intervals_span_start ON intervals (span, start);
+CREATE INDEX IF NOT EXISTS intervals_device ON intervals (device_id);
+"""
+
+def hex_address(value):
+    return f"{value:032x}"
+
+def open_index(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+# A directory means every converted file below it, since fleet output mirrors
+# the input tree; anything else is used as a glob
+def find_json_files(source):
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "**", "*.json"), recursive=True)
+    else:
+        paths = glob.glob(source)
+    return [path for path in paths if os.path.basename(path) != MANIFEST_NAME]
+
+# Name devices by their path below the source's fixed root (the directory,
+# or a glob's part before its first wildcard) without the extension, e.g.
+# "site-a/fw1", so equal file names in different directories stay apart and
+# a name never depends on which other files a glob matched. Without a source
+# devices are named by file name.
+def device_names(paths, source=None):
+    root = source_root(source) if source else None
+    return {
+        path: os.path.splitext(os.path.relpath(path, root) if root else os.path.basename(path))[0].replace(os.sep, "/")
+        for path in paths
+    }
+
+def interval_row(device_id, start, end, name, statement_id):
+    return (device_id, (end - start).bit_length(), hex_address(start), hex_address(end), name, statement_id)
+
+def remove_device(connection, device_id):
+    for table in ("statements", "postings", "intervals"):
+        connection.execute(f"DELETE FROM {table} WHERE device_id = ?", (device_id,))
+
+# Index every statement of one converted tree: its tokens, the IP prefixes it
+# mentions and the resolved address objects of the device
+def index_device(connection, device_id, config):
+    statements = []
+    postings = []
+    intervals = []
+    for statement_id, tokens in enumerate(iter_statements(config)):
+        statements.append((device_id, statement_id, " ".join(tokens)))
+        postings.extend((token, device_id, statement_id) for token in set(tokens))
+        for token in tokens:
+            if any(c in token for c in ".:") and token[0].isalnum():
+                try:
+                    start, end = prefix_to_interval(token)
+                except ValueError:
+                    continue
+                intervals.append(interval_row(device_id, start, end, None, statement_id))
+
+    for (book, name), object_intervals in build_address_resolver(config)["resolved"].items():
+        intervals.extend(interval_row(device_id, s, e, f"{book}/{name}", None) for s, e in object_intervals)
+
+    connection.executemany("INSERT INTO statements VALUES (?, ?, ?)", statements)
+    connection.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?)", postings)
+    connection.executemany("INSERT INTO intervals VALUES (?, ?, ?, ?, ?, ?)", intervals)
+    return len(statements)
+
+# Re-index only the files whose content hash changed since the last run
+def update_index(db_path, source, prune=False):
+    connection = open_index(db_path)
+    known = {}
+    names_by_path = {}
+    for device_id, name, path, sha in connection.execute("SELECT id, name, path, sha256 FROM devices"):
+        known[name] = (device_id, sha)
+        names_by_path[os.path.abspath(path)] = name
+    seen = set()
+    counts = {"indexed": 0, "unchanged": 0, "failed": 0, "removed": 0}
+
+    with connection:
+        paths = sorted(find_json_files(source))
+        for path, name in device_names(paths, source).items():
+            seen.add(name)
+            # The same file indexed earlier from a differently rooted source
+            previous_name = names_by_path.get(os.path.abspath(path))
+            if previous_name not in (None, name) and previous_name in known:
+                device_id, _ = known.pop(previous_name)
+                remove_device(connection, device_id)
+                connection.execute("DELETE FROM devices WHERE id = ?", (device_id,))
+                counts["removed"] += 1
+            sha = file_sha256(path)
+            if name in known and known[name][1] == sha:
+                counts["unchanged"] += 1
+                continue
+            try:
+                config = load_json_config(path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {path}: {str(e)}")
+                counts["failed"] += 1
+                continue
+            if name in known:
+                device_id = known[name][0]
+                remove_device(connection, device_id)
+                connection.execute("UPDATE devices SET path = ?, sha256 = ? WHERE id = ?", (path, sha, device_id))
+            else:
+                device_id = connection.execute(
+                    "INSERT INTO devices (name, path, sha256) VALUES (?, ?, ?)", (name, path, sha)
+                ).lastrowid
+            index_device(connection, device_id, config)
+            counts["indexed"] += 1
+
+        if prune:
+            for name, (device_id, _) in known.items():
+                if name not in seen:
+                    remove_device(connection, device_id)
+                    connection.execute("DELETE FROM devices WHERE id = ?", (device_id,))
+                    counts["removed"] += 1
+
+    connection.close()
+    return counts
+
+def search_token(connection, token):
+    return connection.execute(
+        "SELECT d.name, s.text FROM postings p "
+        "JOIN devices d ON d.id = p.device_id "
+        "JOIN statements s ON s.device_id = p.device_id AND s.id = p.statement_id "
+        "WHERE p.token = ? ORDER BY d.name, s.id", (token,)
+    ).fetchall()
+
+# Return (device, object or statement, range) for everything containing the IP
+def search_ip(connection, ip):
+    value = ip_to_int(ip)
+    target = hex_address(value)
+    results = []
+    spans = [row[0] for row in connection.execute("SELECT DISTINCT span FROM intervals")]
+    for span in spans:
+        lowest = hex_address(max(0, value - (1 << span) + 1))
+        results.extend(connection.execute(
+            "SELECT d.name, COALESCE(i.object, s.text), i.start, i.end FROM intervals i "
+            "JOIN devices d ON d.id = i.device_id "
+            "LEFT JOIN statements s ON s.device_id = i.device_id AND s.id = i.statement_id "
+            "WHERE i.span = ? AND i.start BETWEEN ? AND ? AND i.end >= ?",
+            (span, lowest, target, target)
+        ).fetchall())
+    return sorted((device, what, f"{int_to_ip(int(start, 16))}-{int_to_ip(int(end, 16))}")
+                  for device, what, start, end in results)
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet-wide search index over converted SRX configs')
+    parser.add_argument('--db', default='srx_index.db', help='Path of the index database')
+    parser.add_argument('--update', metavar='SOURCE', help='Directory or glob of converted JSON files to (re)index')
+    parser.add_argument('--prune', action='store_true', help='With --update, drop devices whose file is gone')
+    parser.add_argument('--token', action='append', default=[], help='Find statements containing this token or object name')
+    parser.add_argument('--ip', action='append', default=[], help='Find objects and statements containing this IP')
+    args = parser.parse_args()
+
+    if args.update:
+        counts = update_index(args.db, args.update, args.prune)
+        print(f"Indexed {counts['indexed']}, unchanged {counts['unchanged']}, "
+              f"failed {counts['failed']}, removed {counts['removed']} devices in {args.db}")
+
+    if not (args.token or args.ip):
+        return
+    if not os.path.exists(args.db):
+        print(f"Error: File {args.db} not found")
+        return
+
+    connection = open_index(args.db)
+    for token in args.token:
+        rows = search_token(connection, token)
+        print(f"{token}: {len(rows)} statements on {len({device for device, _ in rows})} devices")
+        for device, text in rows:
+            print(f"  {device}: {text}")
+    for ip in args.ip:
+        rows = search_ip(connection, ip)
+        print(f"{ip}: {len(rows)} matches on {len({row[0] for row in rows})} devices")
+        for device, what, covered in rows:
+            print(f"  {device}: {what} ({covered})")
+    connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import re
+import json
+import heapq
+import argparse
+from collections import Counter
+
+from juniper_srx_set_to_json import load_json_config
+from srx_policies import extract_policies
+from srx_routing import build_routing_index
+
+# Lines of "show security flow session" (brief and extensive), matched as
+# bytes so multi-gigabyte dumps are never decoded as a whole:
+#   Session ID: 1234, Policy name: allow-web/5, Timeout: 1800, Valid
+#     In: 10.0.0.1/51234 --> 192.0.2.10/443;tcp, Conn Tag: 0x0, If: ge-0/0/1.0, Pkts: 10, Bytes: 1200,
+#     Out: 192.0.2.10/443 --> 203.0.113.1/51234;tcp, Conn Tag: 0x0, If: ge-0/0/0.0, Pkts: 8, Bytes: 5400,
+SESSION_RE = re.compile(rb'^\s*Session ID:\s*(\d+),\s*Policy name:\s*([^,]+?)(?:/\d+)?,')
+FLOW_RE = re.compile(
+    rb'^\s*(In|Out):\s*(\S+)/(\d+)\s*-->\s*(\S+)/(\d+);([^,\s]+),.*?If:\s*([^,\s]+),\s*Pkts:\s*(\d+),\s*Bytes:\s*(\d+)'
+)
+APPLICATION_RE = re.compile(rb'^\s*Application:\s*([^,/\s]+)')
+
+DEFAULT_SKETCH_SIZE = 1000
+
+# Weighted Misra-Gries sketch holding at most 2 * size keys. When it fills up,
+# the (size + 1)-th largest weight is subtracted from every key and the keys
+# that drop to zero are removed. A key's true weight lies between its count
+# and count + error.
+def new_sketch(size=DEFAULT_SKETCH_SIZE):
+    return {"size": size, "counts": {}, "error": 0, "total": 0}
+
+def sketch_add(sketch, key, weight=1):
+    counts = sketch["counts"]
+    sketch["total"] += weight
+    counts[key] = counts.get(key, 0) + weight
+    if len(counts) > 2 * sketch["size"]:
+        cut = heapq.nlargest(sketch["size"] + 1, counts.values())[-1]
+        sketch["error"] += cut
+        sketch["counts"] = {k: v - cut for k, v in counts.items() if v > cut}
+
+def sketch_top(sketch, top):
+    return heapq.nlargest(top, sketch["counts"].items(), key=lambda item: item[1])
+
+def new_summary(sketch_size=DEFAULT_SKETCH_SIZE):
+    summary = {
+        "sessions": 0,
+        "packets": 0,
+        "bytes": 0,
+        # Bounded by the size of the config, so these are counted exactly
+        "policy": Counter(),
+        "application": Counter(),
+        "zone_pair": Counter(),
+        "policy_bytes": Counter(),
+        "application_bytes": Counter(),
+        "zone_pair_bytes": Counter(),
+    }
+    # Addresses are unbounded and go through sketches
+    for name in ("source", "destination", "conversation"):
+        summary[f"{name}_sessions"] = new_sketch(sketch_size)
+        summary[f"{name}_bytes"] = new_sketch(sketch_size)
+    return summary
+
+# interface_zones maps "ge-0/0/0.0" to its zone, policy_zones maps a policy
+# name that is unique in the config to its zone pair
+def add_session(summary, session, interface_zones, policy_zones):
+    flow = session.get("In")
+    if flow is None:
+        return
+    source, _, destination, port, protocol, interface = flow[:6]
+    packets = flow[6] + (session["Out"][6] if "Out" in session else 0)
+    total_bytes = flow[7] + (session["Out"][7] if "Out" in session else 0)
+
+    policy = session["policy"]
+    application = session.get("application") or f"{protocol}/{port}"
+    from_zone = interface_zones.get(interface)
+    to_zone = interface_zones.get(session["Out"][5]) if "Out" in session else None
+    zone_pair = f"{from_zone}->{to_zone}" if from_zone and to_zone else policy_zones.get(policy, "unknown")
+
+    summary["sessions"] += 1
+    summary["packets"] += packets
+    summary["bytes"] += total_bytes
+    for name, key in (("policy", policy), ("application", application), ("zone_pair", zone_pair)):
+        summary[name][key] += 1
+        summary[f"{name}_bytes"][key] += total_bytes
+    for name, key in (("source", source), ("destination", destination), ("conversation", f"{source}->{destination}")):
+        sketch_add(summary[f"{name}_sessions"], key)
+        sketch_add(summary[f"{name}_bytes"], key, total_bytes)
+
+# Single pass over the dump; only the session being read is kept in memory
+def aggregate_sessions(lines, summary, interface_zones=None, policy_zones=None):
+    interface_zones = interface_zones or {}
+    policy_zones = policy_zones or {}
+    session = None
+    for line in lines:
+        match = FLOW_RE.match(line)
+        if match:
+            if session is not None:
+                direction, source, source_port, destination, port, protocol, interface, packets, count = match.groups()
+                session[direction.decode()] = (
+                    source.decode(), int(source_port), destination.decode(), int(port), protocol.decode(),
+                    interface.decode(), int(packets), int(count),
+                )
+            continue
+        match = SESSION_RE.match(line)
+        if match:
+            if session is not None:
+                add_session(summary, session, interface_zones, policy_zones)
+            session = {"policy": match.group(2).decode(errors='replace')}
+            continue
+        if session is not None:
+            match = APPLICATION_RE.match(line)
+            if match:
+                session["application"] = match.group(1).decode(errors='replace')
+    if session is not None:
+        add_session(summary, session, interface_zones, policy_zones)
+    return summary
+
+def config_zone_maps(config):
+    interface_zones = {
+        unit: details["zone"] for unit, details in build_routing_index(config)["interfaces"].items() if details["zone"]
+    }
+    pairs = {}
+    for policy in extract_policies(config):
+        pairs.setdefault(policy["name"], set()).add(f"{policy['from_zone'] or 'global'}->{policy['to_zone'] or 'global'}")
+    policy_zones = {name: next(iter(zones)) for name, zones in pairs.items() if len(zones) == 1}
+    return interface_zones, policy_zones
+
+def summary_report(summary, top=20):
+    report = {key: summary[key] for key in ("sessions", "packets", "bytes")}
+    for name in ("policy", "application", "zone_pair"):
+        report[f"top_{name}_sessions"] = summary[name].most_common(top)
+        report[f"top_{name}_bytes"] = summary[f"{name}_bytes"].most_common(top)
+    for name in ("source", "destination", "conversation"):
+        for measure in ("sessions", "bytes"):
+            sketch = summary[f"{name}_{measure}"]
+            report[f"top_{name}_{measure}"] = sketch_top(sketch, top)
+            report[f"top_{name}_{measure}_error"] = sketch["error"]
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate "show security flow session" dumps in a single pass')
+    parser.add_argument('input_files', nargs='+', help='Session dumps or batch.py logs')
+    parser.add_argument('--config', help='Converted JSON config used to map interfaces and policies to zones')
+    parser.add_argument('--top', type=int, default=20, help='Entries per ranking')
+    parser.add_argument('--sketch-size', type=int, default=DEFAULT_SKETCH_SIZE, help='Keys tracked per talker sketch')
+    parser.add_argument('-o', '--output-file', default='session_summary.json', help='Path to write the summary JSON to')
+    args = parser.parse_args()
+
+    interface_zones, policy_zones = {}, {}
+    if args.config:
+        try:
+            interface_zones, policy_zones = config_zone_maps(load_json_config(args.config))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading {args.config}: {str(e)}")
+            return
+
+    summary = new_summary(args.sketch_size)
+    for input_file in args.input_files:
+        try:
+            with open(input_file, 'rb') as f:
+                aggregate_sessions(f, summary, interface_zones, policy_zones)
+        except FileNotFoundError:
+            print(f"Error: File {input_file} not found")
+
+    report = summary_report(summary, args.top)
+    with open(args.output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Aggregated {summary['sessions']} sessions ({summary['bytes']} bytes) to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
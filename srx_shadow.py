@@ -0,0 +1,169 @@
+import json
+import argparse
+
+import numpy as np
+
+from juniper_srx_set_to_json import load_json_config
+from srx_policies import extract_policies, index_by_zone_pair
+from srx_addresses import build_address_resolver, resolve_address_name, merge_intervals
+from srx_applications import build_application_resolver, resolve_application_name
+from srx_match import resolve_names, policy_addresses
+
+# Upper bound on the size of one (targets x policies) candidate matrix
+BLOCK_CELLS = 4_000_000
+
+# Flat interval arrays of one match dimension, sorted by (policy, start).
+# Endpoints are replaced by their rank among all endpoints so 128-bit
+# addresses fit in int64 while containment and overlap stay unchanged.
+def build_dimension(interval_lists):
+    points = sorted({value for intervals in interval_lists for interval in intervals for value in interval})
+    rank = {value: position for position, value in enumerate(points)}
+    width = len(points) + 1
+
+    counts = np.array([len(intervals) for intervals in interval_lists], dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    owner = np.repeat(np.arange(len(interval_lists), dtype=np.int64), counts)
+    start = np.array([rank[s] for intervals in interval_lists for s, _ in intervals], dtype=np.int64)
+    end = np.array([rank[e] for intervals in interval_lists for _, e in intervals], dtype=np.int64)
+
+    lo = np.zeros(len(interval_lists), dtype=np.int64)
+    hi = np.zeros(len(interval_lists), dtype=np.int64)
+    filled = counts > 0
+    lo[filled] = start[offsets[filled]]
+    hi[filled] = end[offsets[filled] + counts[filled] - 1]
+
+    return {
+        "owner": owner, "start": start, "end": end, "keys": owner * width + start,
+        "counts": counts, "offsets": offsets, "lo": lo, "hi": hi, "width": width,
+    }
+
+# Exact test for pairs (target j, policy i) in one dimension. "within" is true
+# when every interval of j lies inside an interval of i, "overlap" when any
+# interval of j meets one of i. Both are one searchsorted over all pairs.
+def pair_test(dim, targets, others, mode):
+    counts = dim["counts"][targets]
+    pair_id = np.repeat(np.arange(len(targets)), counts)
+    first = np.cumsum(counts) - counts
+    interval = np.repeat(dim["offsets"][targets] - first, counts) + np.arange(counts.sum())
+    owners = np.repeat(others, counts)
+
+    probe = dim["start"][interval] if mode == "within" else dim["end"][interval]
+    position = np.searchsorted(dim["keys"], owners * dim["width"] + probe, side="right") - 1
+    hit = (position >= 0) & (dim["owner"][position] == owners)
+    if mode == "within":
+        ok = hit & (dim["end"][position] >= dim["end"][interval])
+        return np.bincount(pair_id[~ok], minlength=len(targets)) == 0
+    ok = hit & (dim["end"][position] >= dim["start"][interval])
+    return np.bincount(pair_id[ok], minlength=len(targets)) > 0
+
+# For every valid policy j, the lowest index i of a policy that is earlier
+# (or later) than j, passes the action filter and covers (or overlaps) j in
+# all dimensions; -1 when there is none. Hull comparisons prune candidates in
+# blocks before the exact per-interval test.
+def first_related(dims, valid, actions, later, action_filter, mode):
+    count = len(valid)
+    result = np.full(count, -1, dtype=np.int64)
+    indexes = np.arange(count)
+    targets_all = indexes[valid]
+    block = max(1, BLOCK_CELLS // max(count, 1))
+
+    for block_start in range(0, len(targets_all), block):
+        targets = targets_all[block_start:block_start + block]
+        column = targets[:, None]
+        candidates = valid[None, :] & ((indexes[None, :] > column) if later else (indexes[None, :] < column))
+        if action_filter == "same":
+            candidates &= actions[None, :] == actions[column]
+        elif action_filter == "different":
+            candidates &= actions[None, :] != actions[column]
+        for dim in dims:
+            if mode == "within":
+                candidates &= (dim["lo"][None, :] <= dim["lo"][column]) & (dim["hi"][None, :] >= dim["hi"][column])
+            else:
+                candidates &= (dim["lo"][None, :] <= dim["hi"][column]) & (dim["hi"][None, :] >= dim["lo"][column])
+
+        rows, others = np.nonzero(candidates)
+        pair_targets = targets[rows]
+        for dim in dims:
+            if not len(pair_targets):
+                break
+            keep = pair_test(dim, pair_targets, others, mode)
+            pair_targets, others = pair_targets[keep], others[keep]
+
+        # np.nonzero is row-major, so the first pair of each target has the lowest index
+        unique_targets, first = np.unique(pair_targets, return_index=True)
+        result[unique_targets] = others[first]
+
+    return result
+
+def analyze_policies(policies, addresses, applications, from_zone, to_zone):
+    interval_lists = [
+        [policy_addresses(p, "source_address", lambda n: resolve_address_name(addresses, from_zone, n)) for p in policies],
+        [policy_addresses(p, "destination_address", lambda n: resolve_address_name(addresses, to_zone, n)) for p in policies],
+        [merge_intervals(resolve_names(p["application"], lambda n: resolve_application_name(applications, n))) for p in policies],
+    ]
+    dims = [build_dimension(intervals) for intervals in interval_lists]
+    # Policies with an empty dimension (unresolved objects) never match; leave them out
+    valid = np.logical_and.reduce([dim["counts"] > 0 for dim in dims])
+    action_codes = {}
+    actions = np.array([action_codes.setdefault(p["action"], len(action_codes)) for p in policies], dtype=np.int64)
+
+    shadowed_by = first_related(dims, valid, actions, later=False, action_filter=None, mode="within")
+    covered_by = first_related(dims, valid, actions, later=True, action_filter="same", mode="within")
+    conflict = first_related(dims, valid, actions, later=True, action_filter="different", mode="overlap")
+    # Redundant: a later policy with the same action covers it and nothing in
+    # between with another action overlaps it, so removing it changes nothing
+    redundant = (covered_by >= 0) & ((conflict < 0) | (covered_by < conflict))
+
+    findings = []
+    for position, policy in enumerate(policies):
+        if shadowed_by[position] >= 0:
+            other = policies[shadowed_by[position]]
+            findings.append({
+                "from_zone": from_zone, "to_zone": to_zone, "policy": policy["name"],
+                "sequence": policy["sequence"], "type": "shadowed", "by": other["name"],
+                "conflict": other["action"] != policy["action"],
+            })
+        elif redundant[position]:
+            other = policies[covered_by[position]]
+            findings.append({
+                "from_zone": from_zone, "to_zone": to_zone, "policy": policy["name"],
+                "sequence": policy["sequence"], "type": "redundant", "by": other["name"],
+                "conflict": False,
+            })
+    return findings
+
+# Analyze every zone pair of a converted config. Global policies are skipped
+# since their from-zone/to-zone filters make them incomparable per zone pair.
+def find_shadowed_policies(config):
+    addresses = build_address_resolver(config)
+    applications = build_application_resolver(config)
+    findings = []
+    for (from_zone, to_zone), policies in index_by_zone_pair(extract_policies(config)).items():
+        if from_zone is None:
+            continue
+        findings.extend(analyze_policies(policies, addresses, applications, from_zone, to_zone))
+    return findings
+
+def main():
+    parser = argparse.ArgumentParser(description='Find shadowed and redundant security policies in a converted SRX config')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', default='shadowed_policies.json', help='Path to write the findings to')
+    args = parser.parse_args()
+
+    try:
+        findings = find_shadowed_policies(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    with open(args.output_file, 'w') as f:
+        json.dump(findings, f, indent=2)
+
+    shadowed = sum(1 for finding in findings if finding["type"] == "shadowed")
+    print(f"Found {shadowed} shadowed and {len(findings) - shadowed} redundant policies, written to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import glob
+import json
+import time
+import sqlite3
+import argparse
+
+from juniper_srx_set_to_json import apply_line, load_json_config
+from srx_policies import extract_policies
+from srx_addresses import build_address_resolver
+from srx_applications import build_application_resolver
+from srx_search import hex_address, device_names
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (id INTEGER PRIMARY KEY, name TEXT UNIQUE, source TEXT);
+CREATE TABLE IF NOT EXISTS nodes (device_id INTEGER, id INTEGER, parent_id INTEGER, depth INTEGER, key TEXT);
+CREATE TABLE IF NOT EXISTS policies (
+    device_id INTEGER, id INTEGER, from_zone TEXT, to_zone TEXT, name TEXT, sequence INTEGER,
+    is_global INTEGER, action TEXT, log_init INTEGER, log_close INTEGER, count INTEGER,
+    scheduler TEXT, description TEXT
+);
+CREATE TABLE IF NOT EXISTS policy_members (device_id INTEGER, policy_id INTEGER, field TEXT, name TEXT);
+CREATE TABLE IF NOT EXISTS addresses (
+    device_id INTEGER, book TEXT, name TEXT, start TEXT, end TEXT
+);
+CREATE TABLE IF NOT EXISTS applications (
+    device_id INTEGER, name TEXT, protocol_low INTEGER, protocol_high INTEGER, port_low INTEGER, port_high INTEGER
+);
+"""
+
+# Created after the rows are loaded; building an index once is much cheaper
+# than maintaining it on every insert
+INDEXES = {
+    "nodes_id": "nodes (device_id, id)",
+    "nodes_key": "nodes (key)",
+    "nodes_parent": "nodes (device_id, parent_id)",
+    "policies_id": "policies (device_id, id)",
+    "policies_zones": "policies (from_zone, to_zone)",
+    "policies_name": "policies (name)",
+    "policy_members_name": "policy_members (field, name)",
+    "policy_members_policy": "policy_members (device_id, policy_id)",
+    "addresses_name": "addresses (name)",
+    "addresses_start": "addresses (start)",
+    "applications_name": "applications (name)",
+    "applications_port": "applications (protocol_low, port_low)",
+}
+
+DEVICE_TABLES = ("nodes", "policies", "policy_members", "addresses", "applications")
+
+def read_config(path):
+    if path.endswith(".json"):
+        return load_json_config(path)
+    config = {}
+    with open(path, 'r') as f:
+        for line in f:
+            apply_line(config, line)
+    return config
+
+# Map every matched file to its device name, named below its own source's
+# root like the other fleet tools (see srx_search.device_names)
+def find_sources(sources):
+    named = {}
+    for source in sources:
+        if os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, "*.set")) + glob.glob(os.path.join(source, "*.json"))
+        else:
+            paths = glob.glob(source)
+        named.update(device_names(sorted(path for path in paths if os.path.isfile(path)), source))
+    return named
+
+# Map each device name to the one file it is loaded from. A directory often
+# holds both fw.set and the fw.json converted from it; the set file is the
+# source of truth, so it wins over a JSON file in the same directory. Any
+# other file claiming a name already taken is reported and skipped rather
+# than silently replacing it.
+def device_sources(named):
+    devices = {}
+    for path in sorted(named, key=lambda path: (not path.endswith(".set"), path)):
+        name = named[path]
+        kept = devices.get(name)
+        if kept is None:
+            devices[name] = path
+        elif os.path.splitext(kept)[0] == os.path.splitext(path)[0]:
+            print(f"Warning: skipping {path}, device '{name}' is loaded from {kept}")
+        else:
+            print(f"Warning: {path} and {kept} are both device '{name}', keeping {kept}")
+    return devices
+
+# One row per token of the tree: dict keys and leaf values alike, so the
+# table mirrors the set statements as an adjacency list
+def node_rows(device_id, config):
+    rows = []
+    stack = [(config, None, 0)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        if isinstance(node, dict):
+            for key, child in node.items():
+                node_id = len(rows)
+                rows.append((device_id, node_id, parent_id, depth, key))
+                stack.append((child, node_id, depth + 1))
+        else:
+            for value in (node if isinstance(node, list) else [node]):
+                rows.append((device_id, len(rows), parent_id, depth, value))
+    return rows
+
+def policy_rows(device_id, config):
+    policies = []
+    members = []
+    for policy_id, p in enumerate(extract_policies(config)):
+        policies.append((
+            device_id, policy_id, p["from_zone"], p["to_zone"], p["name"], p["sequence"], int(p["global"]),
+            p["action"], int(p["log_init"]), int(p["log_close"]), int(p["count"]), p["scheduler"], p["description"],
+        ))
+        for field in ("source_address", "destination_address", "application", "match_from_zone", "match_to_zone"):
+            members.extend((device_id, policy_id, field, name) for name in p[field])
+    return policies, members
+
+def address_rows(device_id, config):
+    return [
+        (device_id, book, name, hex_address(start), hex_address(end))
+        for (book, name), intervals in build_address_resolver(config)["resolved"].items()
+        for start, end in intervals
+    ]
+
+def application_rows(device_id, config):
+    return [
+        (device_id, name, start >> 16, end >> 16, start & 0xffff, end & 0xffff)
+        for name, intervals in build_application_resolver(config)["resolved"].items()
+        for start, end in intervals
+    ]
+
+def device_id_for(connection, name, source):
+    row = connection.execute("SELECT id FROM devices WHERE name = ?", (name,)).fetchone()
+    if row:
+        connection.execute("UPDATE devices SET source = ? WHERE id = ?", (source, row[0]))
+        return row[0], True
+    return connection.execute("INSERT INTO devices (name, source) VALUES (?, ?)", (name, source)).lastrowid, False
+
+# Remove the rows of every device being replaced in one pass per table
+def delete_devices(connection, device_ids):
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS replaced (id INTEGER PRIMARY KEY)")
+    connection.execute("DELETE FROM replaced")
+    connection.executemany("INSERT INTO replaced VALUES (?)", ((device_id,) for device_id in device_ids))
+    for table in DEVICE_TABLES:
+        connection.execute(f"DELETE FROM {table} WHERE device_id IN (SELECT id FROM replaced)")
+
+def export_device(connection, device_id, config):
+    policies, members = policy_rows(device_id, config)
+    rows = {
+        "nodes": node_rows(device_id, config),
+        "policies": policies,
+        "policy_members": members,
+        "addresses": address_rows(device_id, config),
+        "applications": application_rows(device_id, config),
+    }
+    started = time.perf_counter()
+    for table, table_rows in rows.items():
+        if table_rows:
+            placeholders = ", ".join("?" * len(table_rows[0]))
+            connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", table_rows)
+    return sum(len(table_rows) for table_rows in rows.values()), time.perf_counter() - started
+
+# Load every named file in a single transaction. The rows of devices being
+# replaced are deleted first, while the device_id indexes still exist; the
+# indexes are then dropped for the bulk insert and rebuilt once at the end.
+# A source that fails to read is left with no rows. Returns the device count,
+# the row count and the time spent inserting.
+def export_to_sqlite(named, db_path):
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("PRAGMA journal_mode = MEMORY")
+
+    total_rows = 0
+    insert_seconds = 0
+    with connection:
+        devices = {}
+        replaced = []
+        for name, path in device_sources(named).items():
+            device_id, existed = device_id_for(connection, name, path)
+            devices[device_id] = path
+            if existed:
+                replaced.append(device_id)
+        delete_devices(connection, replaced)
+        for index in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {index}")
+
+        for device_id, path in devices.items():
+            try:
+                config = read_config(path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {path}: {str(e)}")
+                continue
+            rows, seconds = export_device(connection, device_id, config)
+            total_rows += rows
+            insert_seconds += seconds
+
+    with connection:
+        for index, columns in INDEXES.items():
+            connection.execute(f"CREATE INDEX {index} ON {columns}")
+    connection.close()
+    return len(devices), total_rows, insert_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description='Export converted SRX configs into a SQLite database')
+    parser.add_argument('sources', nargs='+', help='Set files, converted JSON files, directories or globs')
+    parser.add_argument('-o', '--output-file', default='srx_configs.db', help='Path of the SQLite database')
+    args = parser.parse_args()
+
+    named = find_sources(args.sources)
+    if not named:
+        print("Error: no input files found")
+        return
+
+    devices, total_rows, insert_seconds = export_to_sqlite(named, args.output_file)
+    rate = total_rows / insert_seconds if insert_seconds else 0
+    print(f"Exported {devices} configs ({total_rows} rows inserted at {rate:,.0f} rows/sec) to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import re
+import json
+import argparse
+import ipaddress
+from collections.abc import Mapping
+
+from juniper_srx_set_to_json import load_json_config
+
+PORT_RANGE_RE = re.compile(r'^(\d+)-(\d+)$')
+
+# A port or "low-high" range; named ports such as "http" stay strings
+def to_port(value):
+    if value.isdigit():
+        return int(value)
+    match = PORT_RANGE_RE.match(value)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    raise ValueError(value)
+
+def to_network(value):
+    try:
+        return ipaddress.ip_network(value)
+    except ValueError:
+        # Host bits set, e.g. an address-book entry 10.0.0.2/24
+        return ipaddress.ip_interface(value)
+
+# Leaf types by the keys leading to the leaf, longest suffix first; "*"
+# stands for a user-chosen name. Leaves matching no suffix stay strings,
+# whatever they look like (descriptions, object names such as "10-20").
+LEAF_TYPES = [
+    (("address-book", "*", "address", "*"), to_network),
+    (("rule", "*", "match", "source-address"), to_network),
+    (("rule", "*", "match", "destination-address"), to_network),
+    (("address-book", "address", "*"), to_network),
+    (("pool", "*", "address"), to_network),
+    (("inet", "address"), ipaddress.ip_interface),
+    (("inet6", "address"), ipaddress.ip_interface),
+    (("prefix-list", "*"), to_network),
+    (("prefix",), to_network),
+    (("destination-port",), to_port),
+    (("source-port",), to_port),
+    (("next-hop",), ipaddress.ip_address),
+    (("name-server",), ipaddress.ip_address),
+    (("mtu",), int),
+    (("vlan-id",), int),
+    (("inactivity-timeout",), int),
+    (("metric",), int),
+    (("preference",), int),
+]
+
+# Keys whose values are keywords rather than data; "then count" and
+# "system services ssh" read back as {"count": True} and {"ssh": True}
+FLAG_KEYS = {
+    "then", "permit", "log", "count", "services", "system-services", "protocols", "source-nat", "destination-nat",
+}
+
+def leaf_type(path):
+    for pattern, converter in LEAF_TYPES:
+        if len(pattern) <= len(path) and all(
+            expected in ("*", key) for expected, key in zip(pattern, path[len(path) - len(pattern):])
+        ):
+            return converter
+    return None
+
+# Convert one leaf string to the native type of its path; a value the type
+# does not accept (a named port, "any") stays a string
+def convert_leaf(value, path):
+    converter = leaf_type(path)
+    if converter is None:
+        return value
+    try:
+        return converter(value)
+    except ValueError:
+        return value
+
+def convert_node(node, path):
+    if isinstance(node, dict):
+        # An empty branch is a presence flag such as "then count"
+        return TypedNode(node, path) if node else True
+    if path and path[-1] in FLAG_KEYS:
+        return TypedNode(dict.fromkeys(node if isinstance(node, list) else [node], {}), path)
+    if isinstance(node, list):
+        return [convert_leaf(value, path) for value in node]
+    return convert_leaf(node, path)
+
+# Read-only view over a converted tree. Values are converted the first time
+# they are read and cached, so loops over the tree pay the parse cost once.
+class TypedNode(Mapping):
+    __slots__ = ("_raw", "_path", "_cache")
+
+    def __init__(self, raw, path=()):
+        self._raw = raw
+        self._path = path
+        self._cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = convert_node(self._raw[key], self._path + (key,))
+            return value
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __repr__(self):
+        return f"TypedNode({list(self._raw)!r})"
+
+def typed_view(config):
+    return TypedNode(config)
+
+# Fully converted plain structure, for printing or debugging
+def to_native(node):
+    if isinstance(node, TypedNode):
+        return {key: to_native(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [to_native(value) for value in node]
+    return node
+
+def main():
+    parser = argparse.ArgumentParser(description='Show a subtree of a converted SRX config with typed leaves')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('path', nargs='*', help='Keys leading to the subtree to show')
+    args = parser.parse_args()
+
+    try:
+        node = typed_view(load_json_config(args.input_file))
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    for key in args.path:
+        if not isinstance(node, Mapping) or key not in node:
+            print(f"Error: path '{' '.join(args.path)}' not found")
+            return
+        node = node[key]
+
+    def describe(value, indent):
+        if isinstance(value, TypedNode):
+            for key, child in value.items():
+                if isinstance(child, TypedNode):
+                    print(f"{indent}{key}:")
+                    describe(child, indent + "    ")
+                else:
+                    print(f"{indent}{key}: {child!r}")
+        else:
+            print(f"{indent}{value!r}")
+
+    describe(node, "")
+
+if __name__ == "__main__":
+    main()
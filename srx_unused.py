@@ -0,0 +1,156 @@
+import json
+import argparse
+from collections import deque
+
+from juniper_srx_set_to_json import load_json_config, branch, format_statement
+from srx_policies import extract_policies
+from srx_addresses import load_address_books
+from srx_applications import load_applications
+from srx_nat import extract_nat
+
+# Objects are keyed (kind, book, name); applications and schedulers have no
+# book and use None
+def object_statement(config, key):
+    kind, book, name = key
+    if kind in ("address", "address-set"):
+        if book in branch(config, "security", "address-book"):
+            return ("security", "address-book", book, kind, name)
+        return ("security", "zones", "security-zone", book, "address-book", kind, name)
+    if kind in ("application", "application-set"):
+        return ("applications", kind, name)
+    return ("schedulers", "scheduler", name)
+
+# Build the reference graph in one pass over the definitions, the set members,
+# the policies and the NAT rules. Returns the defined objects, the referrers of
+# each object and the outgoing edges of every referrer (policies and NAT rules
+# are the roots).
+def build_reference_graph(config):
+    addresses, address_sets, zone_books = load_address_books(config)
+    applications, application_sets = load_applications(config)
+
+    objects = set()
+    objects.update(("address", book, name) for book, name in addresses)
+    objects.update(("address-set", book, name) for book, name in address_sets)
+    objects.update(("application", None, name) for name in applications)
+    objects.update(("application-set", None, name) for name in application_sets)
+    objects.update(("scheduler", None, name) for name in branch(config, "schedulers", "scheduler"))
+
+    referrers = {key: [] for key in objects}
+    edges = {}
+    roots = []
+
+    def add_reference(source, key):
+        if key is not None:
+            referrers[key].append(source)
+            edges.setdefault(source, []).append(key)
+
+    # Names resolve in the address-books attached to the zones, then global
+    def address_key(zones, name):
+        for book in [b for zone in zones for b in zone_books.get(zone, [])] + ["global"]:
+            for kind in ("address", "address-set"):
+                if (kind, book, name) in objects:
+                    return kind, book, name
+        return None
+
+    def application_key(name):
+        for kind in ("application", "application-set"):
+            if (kind, None, name) in objects:
+                return kind, None, name
+        return None
+
+    for (book, name), members in address_sets.items():
+        for kind, member in members:
+            key = (kind, book, member) if (kind, book, member) in objects else (kind, "global", member)
+            add_reference(("address-set", book, name), key if key in objects else None)
+    for name, members in application_sets.items():
+        for member in members:
+            add_reference(("application-set", None, name), application_key(member))
+
+    for policy in extract_policies(config):
+        source = ("policy", policy["from_zone"] or "global", policy["to_zone"] or "global", policy["name"])
+        roots.append(source)
+        # Global policies only see the global address-book
+        from_zones = [policy["from_zone"]] if policy["from_zone"] else []
+        to_zones = [policy["to_zone"]] if policy["to_zone"] else []
+        for name in policy["source_address"]:
+            add_reference(source, address_key(from_zones, name))
+        for name in policy["destination_address"]:
+            add_reference(source, address_key(to_zones, name))
+        for name in policy["application"]:
+            add_reference(source, application_key(name))
+        if policy["scheduler"] and ("scheduler", None, policy["scheduler"]) in objects:
+            add_reference(source, ("scheduler", None, policy["scheduler"]))
+
+    rule_sets, _ = extract_nat(config)
+    for rule_set in rule_sets:
+        zones = rule_set["from"].get("zone", []) + rule_set["to"].get("zone", [])
+        for rule in rule_set["rules"]:
+            source = ("nat-rule", rule["type"], rule_set["name"], rule["name"])
+            roots.append(source)
+            for name in rule["source_address_name"] + rule["destination_address_name"]:
+                add_reference(source, address_key(zones, name))
+            for name in rule["application"]:
+                add_reference(source, application_key(name))
+
+    return objects, referrers, edges, roots
+
+# Unused objects have no referrer at all; transitively unused ones are only
+# referenced from objects that no policy or NAT rule reaches
+def find_unused(config):
+    objects, referrers, edges, roots = build_reference_graph(config)
+    reached = set(roots)
+    queue = deque(roots)
+    while queue:
+        for key in edges.get(queue.popleft(), ()):
+            if key not in reached:
+                reached.add(key)
+                queue.append(key)
+
+    unused = sorted((key for key in objects if not referrers[key]), key=str)
+    transitive = sorted((key for key in objects if referrers[key] and key not in reached), key=str)
+    return unused, transitive, referrers
+
+def describe(key):
+    return f"{key[0]} {'/'.join(part for part in key[1:] if part is not None)}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Report SRX objects that no policy or NAT rule references')
+    parser.add_argument('input_file', help='JSON file produced by set_to_json')
+    parser.add_argument('-o', '--output-file', help='Write the report as JSON to this file')
+    parser.add_argument('--delete', action='store_true', help='Print delete commands for every unused object')
+    args = parser.parse_args()
+
+    try:
+        config = load_json_config(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: File {args.input_file} not found")
+        return
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON format")
+        return
+
+    unused, transitive, referrers = find_unused(config)
+
+    if args.delete:
+        for key in unused + transitive:
+            print(f"delete {format_statement(object_statement(config, key))}")
+        return
+
+    for key in unused:
+        print(f"Unused: {describe(key)}")
+    for key in transitive:
+        print(f"Transitively unused: {describe(key)} (referenced by {', '.join(describe(r) for r in referrers[key])})")
+    print(f"{len(unused)} unused and {len(transitive)} transitively unused objects")
+
+    if args.output_file:
+        report = {
+            "unused": [list(key) for key in unused],
+            "transitively_unused": [
+                {"object": list(key), "referenced_by": [list(r) for r in referrers[key]]} for key in transitive
+            ],
+        }
+        with open(args.output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import ctypes
+import select
+import struct
+import argparse
+import datetime
+import ctypes.util
+
+from juniper_srx_set_to_json import set_to_json
+from srx_fleet import file_sha256, output_path_for
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+EVENT_HEADER = struct.Struct("iIII")
+
+def timestamp():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+# Watch a directory with inotify through libc; returns a function that waits
+# up to timeout seconds and yields the names of files that were written
+def inotify_waiter(directory):
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+        os.close(fd)
+        raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(timeout):
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(fd, 65536)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.append(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    return wait
+
+# Fallback for platforms without inotify: compare mtime and size per scan
+def polling_waiter(directory, interval):
+    seen = {}
+
+    # Files removed or renamed between listing and stat are skipped
+    def scan():
+        states = {}
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    states[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return states
+
+    seen.update(scan())
+
+    def wait(timeout):
+        time.sleep(min(timeout, interval) if timeout is not None else interval)
+        current = scan()
+        changed = [name for name, state in current.items() if seen.get(name) != state]
+        seen.clear()
+        seen.update(current)
+        return changed
+
+    return wait
+
+# Convert into a temporary file next to the output and rename it over the
+# output, so readers never see a partially written JSON file
+def convert_atomically(input_file, output_file):
+    temp_file = f"{output_file}.tmp{os.getpid()}"
+    try:
+        set_to_json(input_file, temp_file)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+# Re-convert a file unless its content hash matches the last conversion
+def reconvert(input_file, output_dir, hashes):
+    output_file = output_path_for(input_file, output_dir)
+    started = time.perf_counter()
+    try:
+        sha = file_sha256(input_file)
+        if hashes.get(input_file) == sha and os.path.exists(output_file):
+            return
+        convert_atomically(input_file, output_file)
+        hashes[input_file] = sha
+        print(f"[{timestamp()}] Converted {input_file} in {time.perf_counter() - started:.3f}s")
+    except FileNotFoundError:
+        hashes.pop(input_file, None)
+    except Exception as e:
+        print(f"[{timestamp()}] Error converting {input_file}: {str(e)}")
+
+def watch(directory, output_dir, debounce=0.25, poll=False, interval=0.5):
+    os.makedirs(output_dir, exist_ok=True)
+    hashes = {}
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.name.endswith(".set") and entry.is_file():
+            output_file = output_path_for(entry.path, output_dir)
+            if not os.path.exists(output_file) or os.path.getmtime(output_file) < entry.stat().st_mtime:
+                reconvert(entry.path, output_dir, hashes)
+            else:
+                hashes[entry.path] = file_sha256(entry.path)
+
+    wait = None
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            wait = inotify_waiter(directory)
+        except OSError as e:
+            print(f"Warning: inotify unavailable ({str(e)}), falling back to polling")
+    if wait is None:
+        wait = polling_waiter(directory, interval)
+    print(f"[{timestamp()}] Watching {directory} for *.set files, writing to {output_dir}")
+
+    # Bursts of writes to one file are debounced: it is converted once it has
+    # been quiet for the debounce interval
+    pending = {}
+    while True:
+        for name in wait(debounce / 2 if pending else None):
+            if name.endswith(".set"):
+                pending[os.path.join(directory, name)] = time.monotonic()
+        now = time.monotonic()
+        for path in [p for p, changed in pending.items() if now - changed >= debounce]:
+            del pending[path]
+            reconvert(path, output_dir, hashes)
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch a directory and re-convert SRX set files as they change')
+    parser.add_argument('directory', help='Directory the collector drops *.set files into')
+    parser.add_argument('-o', '--output-dir', default='converted', help='Directory for the JSON files')
+    parser.add_argument('--debounce', type=float, default=0.25, help='Seconds a file must be quiet before converting')
+    parser.add_argument('--poll', action='store_true', help='Poll for changes instead of using inotify')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds')
+    args = parser.parse_args()
+
+    try:
+        watch(args.directory, args.output_dir, args.debounce, args.poll, args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+if __name__ == "__main__":
+    main()
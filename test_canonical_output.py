@@ -0,0 +1,66 @@
+import io
+import json
+import random
+
+from juniper_srx_set_to_json import parse_lines, write_json
+
+LINES = [
+    "set system host-name fw1",
+    "set system services ssh root-login deny",
+    "set interfaces ge-0/0/0 unit 0 family inet address 192.0.2.1/24",
+    "set interfaces ge-0/0/1 unit 0 family inet address 10.0.0.1/24",
+    "set security zones security-zone trust address-book address-set LAN address A",
+    "set security zones security-zone trust address-book address-set LAN address B",
+    "set security zones security-zone trust address-book address A 10.0.0.0/25",
+    "set security zones security-zone trust address-book address B 10.0.0.128/25",
+    "set applications application web term t1 protocol tcp destination-port 80",
+]
+
+# Statements whose relative order Junos evaluates, and so must be kept
+ORDERED_LINES = [
+    "set system name-server 192.0.2.54",
+    "set system name-server 192.0.2.53",
+    "set security policies from-zone trust to-zone untrust policy P2 match source-address A",
+    "set security policies from-zone trust to-zone untrust policy P2 match source-address B",
+    "set security policies from-zone trust to-zone untrust policy P2 then permit",
+    "set security policies from-zone trust to-zone untrust policy P1 match source-address any",
+    "set security policies from-zone trust to-zone untrust policy P1 then deny",
+]
+
+
+def canonical(lines):
+    output = io.StringIO()
+    write_json(parse_lines(lines), output, canonical=True)
+    return output.getvalue()
+
+
+def shuffled(rng):
+    lines = LINES[:]
+    rng.shuffle(lines)
+    # Interleave the ordered statements without changing their relative order
+    slots = sorted(rng.sample(range(len(LINES) + len(ORDERED_LINES)), len(ORDERED_LINES)))
+    for slot, line in zip(slots, ORDERED_LINES):
+        lines.insert(slot, line)
+    return lines
+
+
+def test_canonical_output_is_byte_identical_under_reordering():
+    rng = random.Random(11)
+    expected = canonical(LINES + ORDERED_LINES)
+    for _ in range(50):
+        assert canonical(shuffled(rng)) == expected
+
+
+def test_canonical_output_is_the_same_tree():
+    config = parse_lines(LINES + ORDERED_LINES)
+    assert json.loads(canonical(LINES + ORDERED_LINES)) == config
+    plain = io.StringIO()
+    write_json(config, plain)
+    assert json.loads(plain.getvalue()) == config
+
+
+def test_canonical_output_keeps_policy_order():
+    swapped = ORDERED_LINES[:2] + ORDERED_LINES[5:] + ORDERED_LINES[2:5]
+    assert canonical(LINES + swapped) != canonical(LINES + ORDERED_LINES)
+    assert list(json.loads(canonical(LINES + swapped))["security"]["policies"]["from-zone"]["trust"]
+                ["to-zone"]["untrust"]["policy"]) == ["P1", "P2"]
@@ -0,0 +1,82 @@
+from juniper_srx_set_to_json import tokenize, parse_lines, iter_statements, format_statement
+
+
+def test_quoted_tokens_stay_whole():
+    assert tokenize('security policies policy P description "allow web traffic"') == [
+        "security", "policies", "policy", "P", "description", "allow web traffic",
+    ]
+    assert tokenize('system login message ""') == ["system", "login", "message", ""]
+
+
+def test_quoted_value_round_trips_through_format_statement():
+    tokens = ("system", "host-name", "fw 1")
+    config = parse_lines([f"set {format_statement(tokens)}"])
+    assert list(iter_statements(config)) == [tokens]
+
+
+def test_single_leaf_is_a_string():
+    assert parse_lines(["set system host-name fw1"]) == {"system": {"host-name": "fw1"}}
+
+
+def test_repeated_leaf_becomes_a_list_in_order():
+    config = parse_lines([
+        "set p match source-address B",
+        "set p match source-address A",
+        "set p match source-address B",
+    ])
+    assert config == {"p": {"match": {"source-address": ["B", "A"]}}}
+
+
+def test_leaf_that_gains_children_becomes_a_dict():
+    config = parse_lines([
+        "set system services ssh",
+        "set system services ssh root-login deny",
+    ])
+    assert config == {"system": {"services": {"ssh": {"root-login": "deny"}}}}
+
+    config = parse_lines([
+        "set a b x",
+        "set a b y",
+        "set a b y z",
+    ])
+    # Once a node is a branch, later values are stored as keys of it
+    assert config == {"a": {"b": {"x": {}, "y": {"z": {}}}}}
+
+
+def test_single_token_statement_is_a_presence_flag():
+    assert parse_lines(["set system"]) == {"system": {}}
+
+
+def test_delete_node():
+    config = parse_lines([
+        "set security policies policy P1 then permit",
+        "set security policies policy P2 then deny",
+        "delete security policies policy P1",
+    ])
+    assert config == {"security": {"policies": {"policy": {"P2": {"then": "deny"}}}}}
+
+
+def test_delete_single_leaf_value():
+    config = parse_lines([
+        "set p match source-address A",
+        "set p match source-address B",
+        "set p match source-address C",
+        "delete p match source-address B",
+    ])
+    assert config == {"p": {"match": {"source-address": ["A", "C"]}}}
+
+    config = parse_lines(["set p match source-address A", "set p match source-address B",
+                          "delete p match source-address A"])
+    assert config == {"p": {"match": {"source-address": "B"}}}
+
+    config = parse_lines(["set p match source-address A", "delete p match source-address A"])
+    assert config == {"p": {"match": {}}}
+
+
+def test_delete_of_missing_path_is_ignored():
+    config = parse_lines(["set system host-name fw1", "delete system services ssh", "delete interfaces"])
+    assert config == {"system": {"host-name": "fw1"}}
+
+
+def test_other_lines_are_ignored():
+    assert parse_lines(["# comment", "", "show configuration", "set a b"]) == {"a": "b"}
@@ -0,0 +1,81 @@
+import random
+
+from juniper_srx_set_to_json import parse_lines
+from srx_addresses import MAX_ADDRESS, merge_intervals, complement_intervals
+from srx_match import build_mask_index, mask_at, first_match, compile_policy_engine, match_policy
+
+
+def policy_lines(name, source, destination="any", application="any", action="permit",
+                 from_zone="trust", to_zone="untrust", extra=()):
+    prefix = f"set security policies from-zone {from_zone} to-zone {to_zone} policy {name}"
+    return [
+        f"{prefix} match source-address {source}",
+        f"{prefix} match destination-address {destination}",
+        f"{prefix} match application {application}",
+        *(f"{prefix} {line}" for line in extra),
+        f"{prefix} then {action}",
+    ]
+
+
+def test_first_match_masks_agree_with_linear_scan():
+    rng = random.Random(3)
+    for _ in range(50):
+        count = rng.randint(1, 12)
+        dimensions = [
+            [[tuple(sorted(rng.sample(range(100), 2))) for _ in range(rng.randint(0, 3))] for _ in range(count)]
+            for _ in range(3)
+        ]
+        compiled = dict(zip(("source", "destination", "service"), map(build_mask_index, dimensions)))
+        compiled["policies"] = list(range(count))
+
+        for _ in range(200):
+            point = [rng.randrange(-1, 101) for _ in range(3)]
+            expected = next((
+                i for i in range(count)
+                if all(any(s <= p <= e for s, e in dimension[i]) for dimension, p in zip(dimensions, point))
+            ), None)
+            assert first_match(compiled, *point) == expected
+
+
+def test_mask_index_is_empty_outside_every_interval():
+    index = build_mask_index([[(10, 20)], [(15, 30)]])
+    assert mask_at(index, 9) == 0
+    assert mask_at(index, 15) == 0b11
+    assert mask_at(index, 21) == 0b10
+    assert mask_at(index, 31) == 0
+
+
+def test_overlapping_intervals_of_one_policy_keep_its_bit():
+    index = build_mask_index([[(10, 30), (20, 40)]])
+    assert mask_at(index, 35) == 0b1
+    assert mask_at(index, 41) == 0
+
+
+def test_complement_covers_the_rest_of_the_address_space():
+    intervals = merge_intervals([(5, 9), (0, 2), (8, 12)])
+    assert complement_intervals(intervals) == [(3, 4), (13, MAX_ADDRESS)]
+    assert complement_intervals([(0, MAX_ADDRESS)]) == []
+
+
+def test_excluded_source_address_negates_the_match():
+    engine = compile_policy_engine(parse_lines([
+        "set security zones security-zone trust address-book address LAN 10.0.0.0/8",
+        *policy_lines("NOT-LAN", "LAN", action="deny", extra=["match source-address-excluded"]),
+        *policy_lines("ALL", "any"),
+    ]))
+    assert match_policy(engine, "trust", "untrust", "10.1.2.3", "8.8.8.8", "tcp", 443)["name"] == "ALL"
+    assert match_policy(engine, "trust", "untrust", "192.168.1.1", "8.8.8.8", "tcp", 443)["name"] == "NOT-LAN"
+
+
+def test_zone_pair_policies_come_before_global_ones():
+    engine = compile_policy_engine(parse_lines([
+        *policy_lines("PAIR", "any", application="junos-https"),
+        "set security policies global policy G match source-address any",
+        "set security policies global policy G match destination-address any",
+        "set security policies global policy G match application any",
+        "set security policies global policy G match from-zone any",
+        "set security policies global policy G then deny",
+    ]))
+    assert match_policy(engine, "trust", "untrust", "10.0.0.1", "8.8.8.8", "tcp", 443)["name"] == "PAIR"
+    assert match_policy(engine, "trust", "untrust", "10.0.0.1", "8.8.8.8", "tcp", 22)["name"] == "G"
+    assert match_policy(engine, "dmz", "untrust", "10.0.0.1", "8.8.8.8", "tcp", 443)["name"] == "G"
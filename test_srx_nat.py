@@ -0,0 +1,91 @@
+from juniper_srx_set_to_json import parse_lines
+from srx_nat import compile_nat_engine, context_rank, lookup_nat
+
+INTERFACES = [
+    "set interfaces ge-0/0/0 unit 0 family inet address 192.0.2.1/24",
+    "set interfaces ge-0/0/1 unit 0 family inet address 10.0.0.1/24",
+    "set security zones security-zone untrust interfaces ge-0/0/0.0",
+    "set security zones security-zone trust interfaces ge-0/0/1.0",
+]
+
+
+def source_rule_set(name, context, rule, then):
+    prefix = f"set security nat source rule-set {name}"
+    return [
+        f"{prefix} from {context}",
+        f"{prefix} to zone untrust",
+        f"{prefix} rule {rule} match source-address 10.0.0.0/8",
+        f"{prefix} rule {rule} then source-nat {then}",
+    ]
+
+
+def engine_for(lines):
+    return compile_nat_engine(parse_lines(INTERFACES + lines))
+
+
+def test_context_rank_orders_interface_zone_routing_instance():
+    flow = {"interface": "ge-0/0/1.0", "zone": "trust", "routing-instance": "default"}
+    assert context_rank({"interface": ["ge-0/0/1.0"]}, flow) == 0
+    assert context_rank({"zone": ["trust"]}, flow) == 1
+    assert context_rank({"routing-instance": ["default"]}, flow) == 2
+    assert context_rank({}, flow) == 3
+    assert context_rank({"zone": ["dmz"]}, flow) is None
+    assert context_rank({"interface": ["ge-0/0/1.0"]}, dict(flow, interface=None)) == "unsupported"
+
+
+def test_most_specific_rule_set_wins_over_config_order():
+    engine = engine_for([
+        "set security nat source pool P address 198.51.100.10/32",
+        *source_rule_set("BY-INSTANCE", "routing-instance default", "R1", "off"),
+        *source_rule_set("BY-ZONE", "zone trust", "R2", "pool P"),
+        *source_rule_set("BY-INTERFACE", "interface ge-0/0/1.0", "R3", "interface"),
+    ])
+    result = lookup_nat(engine, "trust", "untrust", "10.0.0.5", "8.8.8.8", "tcp", 443,
+                        from_interface="ge-0/0/1.0")
+    assert result["source"]["name"] == "R3"
+    assert result["translated"]["source"] == "interface"
+
+    result = lookup_nat(engine, "trust", "untrust", "10.0.0.5", "8.8.8.8", "tcp", 443)
+    assert result["source"]["name"] == "R2"
+    assert result["translated"]["source"] == "198.51.100.10"
+    assert result["unsupported"] == {"source": ["BY-INTERFACE"]}
+
+
+def test_static_nat_maps_the_prefix_one_to_one():
+    engine = engine_for([
+        "set security nat static rule-set S from zone untrust",
+        "set security nat static rule-set S rule R match destination-address 192.0.2.0/28",
+        "set security nat static rule-set S rule R then static-nat prefix 10.0.0.16/28",
+    ])
+    result = lookup_nat(engine, "untrust", "trust", "203.0.113.9", "192.0.2.5", "tcp", 80)
+    assert result["static"]["name"] == "R"
+    assert result["translated"] == {"source": "203.0.113.9", "destination": "10.0.0.21", "port": 80}
+
+
+def test_destination_pool_translates_address_and_port():
+    engine = engine_for([
+        "set security nat destination pool WEB address 10.0.0.80/32 port 8080",
+        "set security nat destination rule-set D from zone untrust",
+        "set security nat destination rule-set D rule R match destination-address 192.0.2.1/32",
+        "set security nat destination rule-set D rule R match destination-port 443",
+        "set security nat destination rule-set D rule R then destination-nat pool WEB",
+    ])
+    result = lookup_nat(engine, "untrust", "trust", "203.0.113.9", "192.0.2.1", "tcp", 443)
+    assert result["translated"] == {"source": "203.0.113.9", "destination": "10.0.0.80", "port": 8080}
+    result = lookup_nat(engine, "untrust", "trust", "203.0.113.9", "192.0.2.1", "tcp", 22)
+    assert result["destination"] is None
+
+
+def test_pool_without_an_address_is_unresolved():
+    engine = engine_for([
+        "set security nat destination pool D address port 8080",
+        "set security nat destination rule-set D from zone untrust",
+        "set security nat destination rule-set D rule R match destination-address 192.0.2.1/32",
+        "set security nat destination rule-set D rule R then destination-nat pool D",
+    ])
+    pool = engine["pools"][("destination", "D")]
+    assert pool["addresses"] is None
+    assert pool["unresolved"] == ["port"]
+    result = lookup_nat(engine, "untrust", "trust", "203.0.113.9", "192.0.2.1", "tcp", 80)
+    assert result["destination"]["name"] == "R"
+    assert result["translated"]["destination"] == "192.0.2.1"
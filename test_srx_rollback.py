@@ -0,0 +1,64 @@
+import random
+
+from juniper_srx_set_to_json import parse_lines
+from srx_rollback import convert_rollbacks, history_config
+
+
+def write_rollbacks(directory, versions):
+    files = []
+    for number, lines in enumerate(versions):
+        path = directory / f"rollback_{number}.set"
+        path.write_text("\n".join(lines) + "\n")
+        files.append(str(path))
+    return files
+
+
+def assert_history_matches(directory, versions):
+    history = convert_rollbacks(write_rollbacks(directory, versions))
+    for number, lines in enumerate(versions):
+        assert history_config(history, number) == parse_lines(lines), f"rollback {number}"
+
+
+def test_single_value_left_after_removal_is_a_leaf(tmp_path):
+    assert_history_matches(tmp_path, [
+        [
+            "set system services ssh",
+            "set system services ssh root-login deny",
+            "set p then permit",
+            "set p then permit application-services idp",
+        ],
+        [
+            "set system services ssh",
+            "set p then permit",
+        ],
+    ])
+
+
+def test_leaf_lists_keep_file_order(tmp_path):
+    assert_history_matches(tmp_path, [
+        ["set p match source-address B", "set p match source-address C"],
+        ["set p match source-address A", "set p match source-address B", "set p match source-address C"],
+        ["set p match source-address C", "set p match source-address A"],
+    ])
+
+
+def test_random_histories_match_direct_conversion(tmp_path):
+    rng = random.Random(7)
+    words = ["a", "b", "c", "d"]
+
+    def line():
+        return "set " + " ".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+
+    for case in range(30):
+        versions = [list(dict.fromkeys(line() for _ in range(40)))]
+        for _ in range(6):
+            current = [text for text in versions[-1] if rng.random() > 0.1]
+            for _ in range(3):
+                current.insert(rng.randrange(len(current) + 1), line())
+            if len(current) > 2 and rng.random() < 0.3:
+                i, j = rng.sample(range(len(current)), 2)
+                current[i], current[j] = current[j], current[i]
+            versions.append(current)
+        directory = tmp_path / str(case)
+        directory.mkdir()
+        assert_history_matches(directory, versions)
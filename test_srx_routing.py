@@ -0,0 +1,62 @@
+import ipaddress
+import random
+
+from juniper_srx_set_to_json import parse_lines
+from srx_addresses import ip_to_int
+from srx_routing import build_routing_index, lookup_route, trie_insert, trie_lookup, prefix_key, table_instance
+
+
+def test_trie_lookup_is_the_longest_matching_prefix():
+    rng = random.Random(5)
+    prefixes = {str(ipaddress.ip_network(f"10.{rng.randrange(4)}.{rng.randrange(4)}.0/{rng.choice([8, 16, 20, 24])}",
+                                         strict=False)) for _ in range(40)}
+    root = [None, None, None]
+    for prefix in prefixes:
+        trie_insert(root, prefix, prefix)
+
+    for _ in range(500):
+        address = f"10.{rng.randrange(4)}.{rng.randrange(4)}.{rng.randrange(256)}"
+        matching = [p for p in prefixes if ipaddress.ip_address(address) in ipaddress.ip_network(p)]
+        expected = max(matching, key=lambda p: prefix_key(p)[1], default=None)
+        assert trie_lookup(root, ip_to_int(address)) == expected
+
+
+def test_table_instance():
+    assert table_instance("inet.0") == "master"
+    assert table_instance("inet6.0") == "master"
+    assert table_instance("VR.inet.0") == "VR"
+    assert table_instance("VR.inet6.0") == "VR"
+
+
+def test_next_table_continues_the_lookup_in_the_target_instance():
+    index = build_routing_index(parse_lines([
+        "set interfaces ge-0/0/0 unit 0 family inet address 192.0.2.1/24",
+        "set interfaces ge-0/0/1 unit 0 family inet address 10.0.0.1/24",
+        "set security zones security-zone untrust interfaces ge-0/0/0.0",
+        "set security zones security-zone trust interfaces ge-0/0/1.0",
+        "set routing-instances VR interface ge-0/0/1.0",
+        "set routing-instances VR routing-options static route 10.8.0.0/16 next-hop 10.0.0.2",
+        "set routing-instances VR routing-options static route 0.0.0.0/0 next-table inet.0",
+        "set routing-options static route 0.0.0.0/0 next-hop 192.0.2.254",
+        "set routing-options static route 10.0.0.0/8 next-table VR.inet.0",
+    ]))
+    route, unit = lookup_route(index, "10.8.1.1")
+    assert (route["instance"], route["prefix"], unit) == ("VR", "10.8.0.0/16", "ge-0/0/1.0")
+    route, unit = lookup_route(index, "8.8.8.8", "VR")
+    assert (route["instance"], route["prefix"], unit) == ("master", "0.0.0.0/0", "ge-0/0/0.0")
+
+
+def test_rib_static_routes_belong_to_the_table_instance():
+    index = build_routing_index(parse_lines([
+        "set interfaces ge-0/0/0 unit 0 family inet6 address 2001:db8::1/64",
+        "set interfaces ge-0/0/1 unit 0 family inet6 address 2001:db8:1::1/64",
+        "set routing-options rib inet6.0 static route ::/0 next-hop 2001:db8::2",
+        "set routing-instances VR interface ge-0/0/1.0",
+        "set routing-instances VR routing-options rib VR.inet6.0 static route 2001:db8:9::/48 next-hop 2001:db8:1::2",
+    ]))
+    route, unit = lookup_route(index, "2001:db8:5::1")
+    assert (route["instance"], route["prefix"], unit) == ("master", "::/0", "ge-0/0/0.0")
+    route, unit = lookup_route(index, "2001:db8:9::1", "VR")
+    assert (route["instance"], route["prefix"], unit) == ("VR", "2001:db8:9::/48", "ge-0/0/1.0")
+    route, unit = lookup_route(index, "2001:db8:9::1")
+    assert (route["instance"], route["prefix"], unit) == ("master", "::/0", "ge-0/0/0.0")